@@ -4,20 +4,34 @@ Complete Spring Boot Delegate Auto-Generation System
 Generates business logic for Spring Boot delegates by mapping external to internal APIs
 """
 
-import yaml
 import json
 import re
+import hashlib
+import io
+import os
+import sqlite3
+import sys
+import textwrap
+import threading
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
-import litellm
+from typing import Dict, FrozenSet, List, Any, Iterator, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used when missing
+    orjson = None
 
 
 # ============================================================================
 # DATA MODELS
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Parameter:
     name: str
     location: str  # path, query, header, body
@@ -26,7 +40,7 @@ class Parameter:
     description: str = ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Endpoint:
     path: str
     method: str
@@ -37,42 +51,109 @@ class Endpoint:
     summary: str
     description: str
     tag: str = "default"
+    path_tokens: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Lowercased path segments, computed once for endpoint matching
+        object.__setattr__(self, 'path_tokens', frozenset(self.path.lower().split('/')))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EndpointMapping:
     external_endpoint: Endpoint
     internal_endpoint: Endpoint
     param_mapping: Dict[str, str]
 
 
+@dataclass(slots=True)
+class DelegateBuffer:
+    java_file: Path
+    content: str
+    new_methods: Dict[str, str] = field(default_factory=dict)  # method name -> formatted method
+
+
 # ============================================================================
 # OAS PARSER
 # ============================================================================
 
+_yaml = None
+
+
+def _get_yaml():
+    """Import PyYAML on first use so paths that never touch YAML skip its cost"""
+    global _yaml
+    if _yaml is None:
+        import yaml as _yaml
+    return _yaml
+
+
+@lru_cache(maxsize=16)
+def _load_spec(spec_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Load a YAML/JSON spec, memoized on (path, mtime, size)"""
+    with open(spec_path, 'rb') as f:
+        data = f.read()
+    if spec_path.endswith(('.yaml', '.yml')):
+        yaml = _get_yaml()
+        # libyaml-backed loader when PyYAML was built with it, pure-Python otherwise
+        return yaml.load(data, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+    return _json_loads(data)
+
+
+def _json_loads(data):
+    """Parse JSON with orjson when installed, stdlib json otherwise"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps_indented(obj) -> str:
+    """Serialize JSON with two-space indentation"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, indent=2)
+
+
 class OASParser:
     """Parse OpenAPI Specification and extract endpoint details"""
     
     def __init__(self, spec_path: str):
         self.spec_path = Path(spec_path)
-        with open(spec_path, 'r') as f:
-            if spec_path.endswith(('.yaml', '.yml')):
-                self.spec = yaml.safe_load(f)
-            else:
-                self.spec = json.load(f)
+        stat = self.spec_path.stat()
+        self.spec = _load_spec(str(spec_path), stat.st_mtime_ns, stat.st_size)
+    
+    # Specs with more paths than this are parsed across worker processes
+    PARALLEL_PARSE_THRESHOLD = 1000
     
     def parse_endpoints(self) -> List[Endpoint]:
         """Extract all endpoints from OAS"""
+        items = list(self.spec.get('paths', {}).items())
+        
+        workers = os.cpu_count() or 1
+        if len(items) < self.PARALLEL_PARSE_THRESHOLD or workers < 2:
+            return self._parse_path_items(items)
+        
+        chunk_size = -(-len(items) // workers)
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        
+        endpoints = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() preserves chunk order, so endpoints keep spec order
+            for chunk_endpoints in executor.map(_parse_path_chunk, chunks):
+                endpoints.extend(chunk_endpoints)
+        return endpoints
+    
+    @classmethod
+    def _parse_path_items(cls, items: List[Tuple[str, Dict]]) -> List[Endpoint]:
+        """Extract endpoints from (path, path item) pairs"""
         endpoints = []
-        paths = self.spec.get('paths', {})
         
-        for path, methods in paths.items():
+        for path, methods in items:
             for method, details in methods.items():
                 if method.lower() not in ['get', 'post', 'put', 'delete', 'patch']:
                     continue
                 
                 # Parse parameters
-                parameters = self._parse_parameters(details.get('parameters', []))
+                parameters = cls._parse_parameters(details.get('parameters', []))
                 
                 # Parse request body
                 request_body = details.get('requestBody')
@@ -81,12 +162,12 @@ class OASParser:
                         name="body",
                         location="body",
                         required=request_body.get('required', False),
-                        type=self._extract_schema_type(request_body),
+                        type=cls._extract_schema_type(request_body),
                         description="Request body"
                     ))
                 
                 # Parse response type
-                response_type = self._extract_response_type(details.get('responses', {}))
+                response_type = cls._extract_response_type(details.get('responses', {}))
                 
                 # Get tag
                 tags = details.get('tags', ['default'])
@@ -95,7 +176,7 @@ class OASParser:
                 endpoints.append(Endpoint(
                     path=path,
                     method=method.upper(),
-                    operation_id=details.get('operationId', self._generate_operation_id(method, path)),
+                    operation_id=details.get('operationId', cls._generate_operation_id(method, path)),
                     parameters=parameters,
                     request_body=request_body,
                     response_type=response_type,
@@ -106,7 +187,8 @@ class OASParser:
         
         return endpoints
     
-    def _parse_parameters(self, params: List[Dict]) -> List[Parameter]:
+    @staticmethod
+    def _parse_parameters(params: List[Dict]) -> List[Parameter]:
         """Parse parameter definitions"""
         parsed = []
         for p in params:
@@ -119,7 +201,8 @@ class OASParser:
             ))
         return parsed
     
-    def _extract_schema_type(self, request_body: Dict) -> str:
+    @staticmethod
+    def _extract_schema_type(request_body: Dict) -> str:
         """Extract type from request body schema"""
         content = request_body.get('content', {})
         json_content = content.get('application/json', {})
@@ -129,7 +212,8 @@ class OASParser:
             return schema['$ref'].split('/')[-1]
         return schema.get('type', 'Object')
     
-    def _extract_response_type(self, responses: Dict) -> Optional[str]:
+    @staticmethod
+    def _extract_response_type(responses: Dict) -> Optional[str]:
         """Extract response type from 200/201 responses"""
         for status in ['200', '201']:
             if status in responses:
@@ -144,7 +228,8 @@ class OASParser:
         
         return None
     
-    def _generate_operation_id(self, method: str, path: str) -> str:
+    @staticmethod
+    def _generate_operation_id(method: str, path: str) -> str:
         """Generate operation ID from method and path"""
         path_parts = [p for p in path.split('/') if p and not p.startswith('{')]
         return method.lower() + ''.join(p.capitalize() for p in path_parts)
@@ -157,6 +242,11 @@ class OASParser:
         return ''
 
 
+def _parse_path_chunk(items: List[Tuple[str, Dict]]) -> List[Endpoint]:
+    """Process-pool entry point for parsing a slice of the spec paths"""
+    return OASParser._parse_path_items(items)
+
+
 # ============================================================================
 # ENDPOINT MAPPER
 # ============================================================================
@@ -168,7 +258,7 @@ class EndpointMapper:
         self.manual_mappings = {}
         if mapping_file and Path(mapping_file).exists():
             with open(mapping_file, 'r') as f:
-                data = yaml.safe_load(f)
+                data = _get_yaml().safe_load(f)
                 self.manual_mappings = {
                     m['external_operation_id']: m
                     for m in data.get('mappings', [])
@@ -181,6 +271,7 @@ class EndpointMapper:
     ) -> List[EndpointMapping]:
         """Create mappings between external and internal endpoints"""
         mappings = []
+        self._index_endpoints(internal_endpoints)
         
         for ext_ep in external_endpoints:
             # Check manual mapping first
@@ -210,16 +301,28 @@ class EndpointMapper:
         
         return mappings
     
+    def _index_endpoints(self, internal_endpoints: List[Endpoint]):
+        """Precompute lookup tables over the internal endpoints"""
+        self._by_operation_id = {}
+        self._by_operation_id_lower = {}
+        self._by_method = defaultdict(set)
+        self._by_path_token = defaultdict(set)
+        
+        # setdefault keeps the first endpoint, matching a linear scan
+        for idx, ep in enumerate(internal_endpoints):
+            self._by_operation_id.setdefault(ep.operation_id, ep)
+            self._by_operation_id_lower.setdefault(ep.operation_id.lower(), ep)
+            self._by_method[ep.method].add(idx)
+            for token in ep.path_tokens:
+                self._by_path_token[token].add(idx)
+    
     def _find_endpoint_by_operation_id(
         self,
         endpoints: List[Endpoint],
         operation_id: str
     ) -> Optional[Endpoint]:
         """Find endpoint by operation ID"""
-        for ep in endpoints:
-            if ep.operation_id == operation_id:
-                return ep
-        return None
+        return self._by_operation_id.get(operation_id)
     
     def _find_best_match(
         self,
@@ -228,17 +331,17 @@ class EndpointMapper:
     ) -> Optional[Endpoint]:
         """Find best matching internal endpoint"""
         # First try exact operation ID match
-        for int_ep in internal_endpoints:
-            if int_ep.operation_id.lower() == external.operation_id.lower():
-                return int_ep
+        int_ep = self._by_operation_id_lower.get(external.operation_id.lower())
+        if int_ep:
+            return int_ep
         
         # Try method + similar path
-        for int_ep in internal_endpoints:
-            if int_ep.method == external.method:
-                ext_parts = set(external.path.lower().split('/'))
-                int_parts = set(int_ep.path.lower().split('/'))
-                if ext_parts & int_parts:  # Has common parts
-                    return int_ep
+        sharing_parts = set().union(
+            *(self._by_path_token.get(part, ()) for part in external.path_tokens)
+        )
+        candidates = self._by_method.get(external.method, set()) & sharing_parts
+        if candidates:
+            return internal_endpoints[min(candidates)]
         
         return None
     
@@ -249,6 +352,10 @@ class EndpointMapper:
         ext_params = {p.name.lower(): p.name for p in ext_ep.parameters}
         int_params = {p.name.lower(): p.name for p in int_ep.parameters}
         
+        # Reversed names sort so that "ends with" becomes a prefix range for bisect
+        int_order = {int_lower: i for i, int_lower in enumerate(int_params)}
+        int_reversed = sorted(int_lower[::-1] for int_lower in int_params)
+        
         for ext_lower, ext_name in ext_params.items():
             # Exact match
             if ext_lower in int_params:
@@ -256,24 +363,176 @@ class EndpointMapper:
                 continue
             
             # Try common variations (userId -> id, etc.)
-            for int_lower, int_name in int_params.items():
-                if ext_lower.endswith(int_lower) or int_lower.endswith(ext_lower):
-                    mapping[ext_name] = int_name
-                    break
+            ext_reversed = ext_lower[::-1]
+            candidates = [
+                ext_lower[i:] for i in range(len(ext_lower) + 1)
+                if ext_lower[i:] in int_params
+            ]
+            i = bisect_left(int_reversed, ext_reversed)
+            while i < len(int_reversed) and int_reversed[i].startswith(ext_reversed):
+                candidates.append(int_reversed[i][::-1])
+                i += 1
+            
+            if candidates:
+                # Prefer the first internal parameter in declaration order
+                mapping[ext_name] = int_params[min(candidates, key=int_order.__getitem__)]
         
         return mapping
 
 
+# ============================================================================
+# LLM RESPONSE CACHE
+# ============================================================================
+
+try:
+    from blake3 import blake3 as _content_hash
+except ImportError:  # optional, blake2b is fast enough next to an LLM call
+    _content_hash = hashlib.blake2b
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "springboot-oas-gen" / "llm.db"
+
+
+class LLMResponseCache:
+    """Persistent cache of generated method bodies keyed by content hash"""
+    
+    MEMO_SIZE = 1024
+    
+    def __init__(self, db_path: Path = DEFAULT_CACHE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[bytes, str]" = OrderedDict()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key BLOB PRIMARY KEY, body TEXT NOT NULL)"
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def key(*parts: str) -> bytes:
+        """Hash the given strings into a cache key"""
+        digest = _content_hash()
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.digest()
+    
+    def get(self, key: bytes) -> Optional[str]:
+        """Return the cached body for key, or None on a miss"""
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+            
+            row = self._conn.execute(
+                "SELECT body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            self._remember(key, row[0])
+            return row[0]
+    
+    def put(self, key: bytes, body: str):
+        """Store a generated body under key"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body) VALUES (?, ?)", (key, body)
+            )
+            self._conn.commit()
+            self._remember(key, body)
+    
+    def _remember(self, key: bytes, body: str):
+        """Keep a bounded in-process copy of recent entries"""
+        self._memo[key] = body
+        self._memo.move_to_end(key)
+        if len(self._memo) > self.MEMO_SIZE:
+            self._memo.popitem(last=False)
+
+
 # ============================================================================
 # CODE GENERATOR (LLM-based)
 # ============================================================================
 
+_RE_MD_JAVA = re.compile(r'```java\n?')
+_RE_MD_PLAIN = re.compile(r'```\n?')
+_RE_PATH_VAR = re.compile(r'\{([^}]+)\}')
+_RE_SIG = re.compile(r'\s*(public|private|protected|@Override).*\(.*\).*\{?$')
+
+
+_LOC_FMT = {
+    'path': '{t} {n} (path parameter)',
+    'body': '{t} {n} (request body)',
+}
+
+
+def _fmt_param(p: Parameter) -> str:
+    """Describe a parameter for the prompt"""
+    return _LOC_FMT.get(p.location, '{t} {n} ({loc} parameter)').format(
+        t=p.type, n=p.name, loc=p.location
+    )
+
+
 class DelegateCodeGenerator:
     """Generate delegate method implementations using LLM"""
     
-    def __init__(self, model: str = "bedrock/amazon.nova-lite-v1:0"):
+    MAX_CONCURRENT_REQUESTS = 16
+    
+    SYSTEM_PROMPT = """You are an expert Spring Boot developer. Generate clean, production-ready Java code.
+Requirements:
+- Use WebClient for REST calls
+- Handle 404 errors by returning ResponseEntity.notFound().build()
+- Map response types correctly
+- Include proper logging
+- Return only the method body (no signature, no class wrapper)
+- Use Java 17+ features
+- Respond with a JSON object whose "body" field holds the method body"""
+    
+    # Delegate bodies are short; a tight token cap and deterministic sampling
+    # keep generation fast and make identical prompts produce identical code
+    COMPLETION_OPTIONS = {
+        "temperature": 0,
+        "max_tokens": 600,
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "method_body",
+                "schema": {
+                    "type": "object",
+                    "properties": {"body": {"type": "string"}},
+                    "required": ["body"]
+                }
+            }
+        }
+    }
+    
+    def __init__(
+        self,
+        model: str = "bedrock/amazon.nova-lite-v1:0",
+        stream: bool = False,
+        cache_path: Optional[Path] = DEFAULT_CACHE_PATH,
+        use_llm: bool = True
+    ):
         self.model = model
-        litellm.set_verbose = False
+        self.stream = stream
+        self.use_llm = use_llm
+        self.cache = None
+        self.litellm = None
+        
+        if not use_llm:
+            # Template-only mode: never pay for importing litellm
+            return
+        
+        if cache_path:
+            try:
+                self.cache = LLMResponseCache(cache_path)
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️  Response cache disabled: {e}")
+        
+        # litellm pulls in a large dependency graph, so import it only when needed
+        import litellm
+        self.litellm = litellm
+        self.litellm.set_verbose = False
     
     def generate_method_body(
         self,
@@ -282,39 +541,259 @@ class DelegateCodeGenerator:
     ) -> str:
         """Generate complete method body"""
         
+        templated = self._try_template(mapping, internal_base_url)
+        if templated is not None:
+            return templated
+        if not self.use_llm:
+            return self._generate_fallback(mapping)
+        
         prompt = self._build_prompt(mapping, internal_base_url)
+        key, cached = self._cache_lookup(prompt)
+        if cached is not None:
+            return cached
         
         try:
-            response = litellm.completion(
+            response = self.litellm.completion(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert Spring Boot developer. Generate clean, production-ready Java code.
-Requirements:
-- Use WebClient for REST calls
-- Handle 404 errors by returning ResponseEntity.notFound().build()
-- Map response types correctly
-- Include proper logging
-- Return only the method body (no signature, no class wrapper)
-- Use Java 17+ features"""
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.2,
-                max_tokens=2000
+                messages=self._build_messages(prompt),
+                **self.COMPLETION_OPTIONS
             )
             
             code = response.choices[0].message.content
-            return self._clean_generated_code(code)
+            return self._cache_store(key, self._extract_body(code))
             
         except Exception as e:
             print(f"⚠️  LLM generation failed: {e}")
             return self._generate_fallback(mapping)
     
+    def generate_method_bodies(
+        self,
+        mappings: List[EndpointMapping],
+        internal_base_url: str
+    ) -> List[str]:
+        """Generate method bodies for all mappings in a single batched request"""
+        
+        # Trivial mappings are rendered from a template and previously generated
+        # prompts come from the cache; only the rest hit the LLM
+        bodies = [self._try_template(m, internal_base_url) for m in mappings]
+        if not self.use_llm:
+            return [
+                body if body is not None else self._generate_fallback(mapping)
+                for mapping, body in zip(mappings, bodies)
+            ]
+        
+        prompts = {}
+        keys = {}
+        for idx, mapping in enumerate(mappings):
+            if bodies[idx] is None:
+                prompts[idx] = self._build_prompt(mapping, internal_base_url)
+                keys[idx], bodies[idx] = self._cache_lookup(prompts[idx])
+        # Identical prompts are sent once and the result fanned out
+        pending = defaultdict(list)
+        for idx, body in enumerate(bodies):
+            if body is None:
+                pending[prompts[idx]].append(idx)
+        
+        if not pending:
+            return bodies
+        
+        messages = [self._build_messages(prompt) for prompt in pending]
+        
+        try:
+            responses = self.litellm.batch_completion(
+                model=self.model,
+                messages=messages,
+                **self.COMPLETION_OPTIONS
+            )
+        except Exception as e:
+            print(f"⚠️  Batch completion unavailable ({e}), falling back to concurrent requests")
+            import asyncio  # only this fallback needs it; importing it costs ~30ms
+            responses = asyncio.run(self._complete_concurrently(messages))
+        
+        for indices, response in zip(pending.values(), responses):
+            if isinstance(response, Exception):
+                print(f"⚠️  LLM generation failed: {response}")
+                for idx in indices:
+                    bodies[idx] = self._generate_fallback(mappings[idx])
+                continue
+            code = response.choices[0].message.content
+            body = self._cache_store(keys[indices[0]], self._extract_body(code))
+            for idx in indices:
+                bodies[idx] = body
+        
+        return bodies
+    
+    def iter_method_bodies(
+        self,
+        mappings: List[EndpointMapping],
+        internal_base_url: str
+    ) -> Iterator[Tuple[int, str]]:
+        """Yield (index, method body) pairs as soon as each generation finishes"""
+        
+        if not self.stream or not self.use_llm:
+            yield from enumerate(self.generate_method_bodies(mappings, internal_base_url))
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_REQUESTS) as executor:
+            futures = {}
+            for idx, mapping in enumerate(mappings):
+                templated = self._try_template(mapping, internal_base_url)
+                if templated is not None:
+                    yield idx, templated
+                else:
+                    futures[executor.submit(self._generate_streamed, mapping, internal_base_url)] = idx
+            
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
+    def _generate_streamed(self, mapping: EndpointMapping, internal_base_url: str) -> str:
+        """Generate a method body from a streamed completion"""
+        
+        prompt = self._build_prompt(mapping, internal_base_url)
+        key, cached = self._cache_lookup(prompt)
+        if cached is not None:
+            return cached
+        
+        try:
+            chunks = self.litellm.completion(
+                model=self.model,
+                messages=self._build_messages(prompt),
+                stream=True,
+                **self.COMPLETION_OPTIONS
+            )
+            
+            code = io.StringIO()
+            for chunk in chunks:
+                code.write(chunk.choices[0].delta.content or '')
+            
+            return self._cache_store(key, self._extract_body(code.getvalue()))
+            
+        except Exception as e:
+            print(f"⚠️  LLM generation failed: {e}")
+            return self._generate_fallback(mapping)
+    
+    def _cache_lookup(self, prompt: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Return (cache key, cached body) for a prompt"""
+        if self.cache is None:
+            return None, None
+        
+        key = LLMResponseCache.key(
+            self.model,
+            self.SYSTEM_PROMPT,
+            json.dumps(self.COMPLETION_OPTIONS, sort_keys=True),
+            prompt
+        )
+        return key, self.cache.get(key)
+    
+    def _cache_store(self, key: Optional[bytes], body: str) -> str:
+        """Cache a successfully generated body and return it"""
+        if self.cache is not None and key is not None:
+            self.cache.put(key, body)
+        return body
+    
+    async def _complete_concurrently(self, messages: List[List[Dict[str, str]]]) -> List[Any]:
+        """Issue one acompletion per message list, bounded by a semaphore"""
+        
+        import asyncio
+        
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        
+        async def complete(msgs):
+            async with semaphore:
+                return await self.litellm.acompletion(
+                    model=self.model,
+                    messages=msgs,
+                    **self.COMPLETION_OPTIONS
+                )
+        
+        return await asyncio.gather(
+            *(complete(msgs) for msgs in messages),
+            return_exceptions=True
+        )
+    
+    def _try_template(self, mapping: EndpointMapping, internal_base_url: str) -> Optional[str]:
+        """Render a WebClient pass-through body for trivial mappings
+        
+        Applies when both endpoints share the HTTP method and response type and
+        every external parameter is mapped; returns None otherwise.
+        """
+        
+        ext = mapping.external_endpoint
+        internal = mapping.internal_endpoint
+        
+        if ext.method != internal.method or ext.response_type != internal.response_type:
+            return None
+        if ext.response_type and not ext.response_type[0].isupper():
+            return None  # schema primitives like 'array' have no Java class
+        if any(p.name not in mapping.param_mapping for p in ext.parameters):
+            return None
+        if any(p.location in ('header', 'cookie') for p in ext.parameters):
+            return None  # header/cookie params are not part of the generated signature
+        
+        # Internal path variables are expanded from the external arguments
+        source_by_target = {target: source for source, target in mapping.param_mapping.items()}
+        path_vars = _RE_PATH_VAR.findall(internal.path)
+        if any(var not in source_by_target for var in path_vars):
+            return None
+        
+        internal_locations = {p.name: p.location for p in internal.parameters}
+        
+        uri_parts = [f'UriComponentsBuilder.fromHttpUrl(internalBaseUrl)',
+                     f'.path("{internal.path}")']
+        request_parts = []
+        body_arg = None
+        for p in ext.parameters:
+            target = mapping.param_mapping[p.name]
+            if p.location in ('path', 'query'):
+                if target in path_vars:
+                    continue  # expanded into the internal path below
+                if internal_locations.get(target, 'query') != 'query':
+                    return None  # only path and query targets are rendered
+                if p.required:
+                    uri_parts.append(f'.queryParam("{target}", {p.name})')
+                else:
+                    # A null argument would still add a bare "?name"
+                    uri_parts.append(f'.queryParamIfPresent("{target}", java.util.Optional.ofNullable({p.name}))')
+            elif p.location == 'body':
+                body_arg = p.name
+        expand_args = ', '.join(source_by_target[var] for var in path_vars)
+        uri_parts.append(f'.buildAndExpand({expand_args})')
+        uri_parts.append('.toUri()')
+        if body_arg:
+            request_parts.append(f'.bodyValue({body_arg})')
+        
+        if ext.response_type:
+            response_parts = [f'.bodyToMono({ext.response_type}.class)', '.map(ResponseEntity::ok)']
+        else:
+            response_parts = ['.toBodilessEntity()']
+        
+        chain = '\n        '.join([
+            f'.method(HttpMethod.{internal.method})',
+            '.uri(uri)',
+            *request_parts,
+            '.retrieve()',
+            *response_parts,
+            '.onErrorResume(WebClientResponseException.NotFound.class,',
+            '        e -> Mono.just(ResponseEntity.notFound().build()))',
+            '.block();'
+        ])
+        uri = '\n        '.join(uri_parts)
+        
+        return f"""log.debug("Handling {ext.method} request for {ext.path}");
+
+URI uri = {uri};
+log.debug("Calling internal API: {internal.method} {{}}", uri);
+
+return webClient
+        {chain}"""
+    
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Build chat messages for a single prompt"""
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
     def _build_prompt(self, mapping: EndpointMapping, internal_base_url: str) -> str:
         """Build detailed prompt for LLM"""
         
@@ -322,14 +801,7 @@ Requirements:
         internal = mapping.internal_endpoint
         
         # Build parameter list
-        param_list = []
-        for p in ext.parameters:
-            if p.location == 'path':
-                param_list.append(f"{p.type} {p.name} (path parameter)")
-            elif p.location == 'body':
-                param_list.append(f"{p.type} {p.name} (request body)")
-            else:
-                param_list.append(f"{p.type} {p.name} ({p.location} parameter)")
+        param_list = ', '.join(_fmt_param(p) for p in ext.parameters)
         
         return f"""Generate a Spring Boot delegate method body that implements this mapping:
 
@@ -337,7 +809,7 @@ EXTERNAL ENDPOINT (what the client calls):
 - Path: {ext.path}
 - Method: {ext.method}
 - Operation ID: {ext.operation_id}
-- Parameters: {', '.join(param_list) if param_list else 'none'}
+- Parameters: {param_list or 'none'}
 - Response Type: {ext.response_type or 'void'}
 
 INTERNAL API CALL (what we need to invoke):
@@ -347,7 +819,7 @@ INTERNAL API CALL (what we need to invoke):
 - Operation ID: {internal.operation_id}
 
 PARAMETER MAPPING:
-{json.dumps(mapping.param_mapping, indent=2)}
+{_json_dumps_indented(mapping.param_mapping)}
 
 IMPLEMENTATION REQUIREMENTS:
 1. Use WebClient (assume it's injected as 'webClient') to call the internal API
@@ -362,35 +834,45 @@ IMPLEMENTATION REQUIREMENTS:
 Generate ONLY the method body code (the content inside the method {{ }}):
 """
     
+    def _extract_body(self, content: str) -> str:
+        """Read the method body from a structured response
+        
+        Providers that ignore response_format return free text, which is
+        cleaned up the old way.
+        """
+        try:
+            body = _json_loads(content)["body"]
+        except (ValueError, TypeError, KeyError):
+            return self._clean_generated_code(content)
+        
+        if not isinstance(body, str):
+            return self._clean_generated_code(content)
+        return body.strip()
+    
     def _clean_generated_code(self, code: str) -> str:
         """Clean and extract Java code from LLM response"""
         # Remove markdown code blocks
-        code = re.sub(r'```java\n?', '', code)
-        code = re.sub(r'```\n?', '', code)
+        code = _RE_MD_JAVA.sub('', code)
+        code = _RE_MD_PLAIN.sub('', code)
         
         # Remove method signatures if accidentally included
-        lines = code.split('\n')
-        filtered = []
+        filtered = io.StringIO()
         skip = False
         
-        for line in lines:
-            stripped = line.strip()
-            
+        for line in code.splitlines(keepends=True):
             # Skip method signatures
-            if re.match(r'(public|private|protected|@Override).*\(.*\).*\{?$', stripped):
-                skip = True
-                if '{' in stripped:
-                    skip = False
+            if _RE_SIG.match(line):
+                skip = '{' not in line
                 continue
             
-            if skip and '{' in stripped:
+            if skip and '{' in line:
                 skip = False
                 continue
             
             if not skip:
-                filtered.append(line)
+                filtered.write(line)
         
-        return '\n'.join(filtered).strip()
+        return filtered.getvalue().strip()
     
     def _generate_fallback(self, mapping: EndpointMapping) -> str:
         """Generate basic fallback implementation"""
@@ -410,11 +892,55 @@ throw new UnsupportedOperationException("Implementation pending for {ext.operati
 # JAVA FILE INJECTOR
 # ============================================================================
 
+_RE_BLANK_LINE = re.compile(r'^[^\S\n]+$', re.MULTILINE)
+
+
+@lru_cache(maxsize=256)
+def _method_signature_pattern(method_name: str) -> re.Pattern:
+    """Compiled pattern matching a delegate method signature"""
+    return re.compile(
+        rf'@Override\s+public\s+ResponseEntity<.*?>\s+{re.escape(method_name)}\s*\([^)]*\)'
+    )
+
+
+@lru_cache(maxsize=256)
+def _method_pattern(method_name: str) -> re.Pattern:
+    """Compiled pattern matching a delegate method up to its opening brace"""
+    return re.compile(
+        rf'(@Override\s+public\s+ResponseEntity<.*?>\s+{re.escape(method_name)}\s*\([^)]*\)\s*\{{)',
+        re.DOTALL
+    )
+
+
 class JavaDelegateInjector:
     """Inject generated code into existing Java delegate classes"""
     
     def __init__(self, delegate_dir: str):
         self.delegate_dir = Path(delegate_dir)
+        self._open_files: Dict[str, DelegateBuffer] = {}
+    
+    def begin(self, class_name: str) -> DelegateBuffer:
+        """Read a delegate class once and buffer all mutations until commit"""
+        
+        if class_name not in self._open_files:
+            java_file = self._java_file(class_name)
+            with open(java_file, 'r') as f:
+                self._open_files[class_name] = DelegateBuffer(java_file, f.read())
+        
+        return self._open_files[class_name]
+    
+    def commit_all(self) -> List[str]:
+        """Write every buffered delegate class exactly once"""
+        
+        written = []
+        for buffer in self._open_files.values():
+            content = self._add_new_methods(buffer.content, list(buffer.new_methods.values()))
+            # newline="" writes '\n' verbatim, so output is identical on every platform
+            buffer.java_file.write_text(content, newline="")
+            written.append(str(buffer.java_file))
+        
+        self._open_files.clear()
+        return written
     
     def inject_method(
         self,
@@ -424,12 +950,18 @@ class JavaDelegateInjector:
         return_type: str,
         method_body: str
     ) -> str:
-        """Inject or update method in delegate class"""
+        """Inject or update method in delegate class
         
-        java_file = self.delegate_dir / f"{class_name}.java"
+        Classes opened with begin() are only modified in memory; otherwise
+        the file is read and written back immediately.
+        """
         
-        if not java_file.exists():
-            raise FileNotFoundError(f"Delegate class not found: {java_file}")
+        buffer = self._open_files.get(class_name)
+        if buffer is not None:
+            self._inject_buffered(buffer, method_name, parameters, return_type, method_body)
+            return str(buffer.java_file)
+        
+        java_file = self._java_file(class_name)
         
         with open(java_file, 'r') as f:
             content = f.read()
@@ -438,9 +970,7 @@ class JavaDelegateInjector:
         signature = self._build_signature(method_name, parameters, return_type)
         
         # Check if method already exists
-        method_pattern = rf'@Override\s+public\s+ResponseEntity<.*?>\s+{re.escape(method_name)}\s*\([^)]*\)'
-        
-        if re.search(method_pattern, content):
+        if _method_signature_pattern(method_name).search(content):
             # Update existing method
             content = self._update_existing_method(content, method_name, method_body)
         else:
@@ -448,11 +978,43 @@ class JavaDelegateInjector:
             content = self._add_new_method(content, signature, method_body)
         
         # Write updated content
-        with open(java_file, 'w') as f:
-            f.write(content)
+        java_file.write_text(content, newline="")
         
         return str(java_file)
     
+    def _inject_buffered(
+        self,
+        buffer: DelegateBuffer,
+        method_name: str,
+        parameters: List[Parameter],
+        return_type: str,
+        method_body: str
+    ):
+        """Inject or update method in a buffered delegate class"""
+        
+        signature = self._build_signature(method_name, parameters, return_type)
+        
+        if method_name in buffer.new_methods:
+            # Injected earlier in this batch, not yet spliced into the class
+            buffer.new_methods[method_name] = self._format_method(signature, method_body)
+        elif _method_signature_pattern(method_name).search(buffer.content):
+            buffer.content = self._update_existing_method(buffer.content, method_name, method_body)
+        else:
+            if '}' not in buffer.content:
+                raise ValueError("Invalid Java class structure")
+            # New methods are spliced in together at commit time
+            buffer.new_methods[method_name] = self._format_method(signature, method_body)
+    
+    def _java_file(self, class_name: str) -> Path:
+        """Resolve the Java source file for a delegate class"""
+        
+        java_file = self.delegate_dir / f"{class_name}.java"
+        
+        if not java_file.exists():
+            raise FileNotFoundError(f"Delegate class not found: {java_file}")
+        
+        return java_file
+    
     def _build_signature(
         self,
         method_name: str,
@@ -479,23 +1041,28 @@ class JavaDelegateInjector:
         """Replace existing method body"""
         
         # Find method start
-        pattern = rf'(@Override\s+public\s+ResponseEntity<.*?>\s+{re.escape(method_name)}\s*\([^)]*\)\s*\{{)'
-        match = re.search(pattern, content, re.DOTALL)
+        match = _method_pattern(method_name).search(content)
         
         if not match:
             return content
         
         method_start = match.end()
         
-        # Find matching closing brace
+        # Find matching closing brace, jumping between braces with str.find
         brace_count = 1
         i = method_start
-        while i < len(content) and brace_count > 0:
-            if content[i] == '{':
+        while brace_count > 0:
+            close = content.find('}', i)
+            if close == -1:
+                i = len(content)
+                break
+            opening = content.find('{', i, close)
+            if opening != -1:
                 brace_count += 1
-            elif content[i] == '}':
+                i = opening + 1
+            else:
                 brace_count -= 1
-            i += 1
+                i = close + 1
         
         method_end = i - 1
         
@@ -511,6 +1078,13 @@ class JavaDelegateInjector:
     
     def _add_new_method(self, content: str, signature: str, body: str) -> str:
         """Add new method before the last closing brace"""
+        return self._add_new_methods(content, [self._format_method(signature, body)])
+    
+    def _add_new_methods(self, content: str, methods: List[str]) -> str:
+        """Add formatted methods before the last closing brace in one splice"""
+        
+        if not methods:
+            return content
         
         # Find last closing brace of class
         last_brace = content.rfind('}')
@@ -518,23 +1092,25 @@ class JavaDelegateInjector:
         if last_brace == -1:
             raise ValueError("Invalid Java class structure")
         
+        new_methods = ''.join(method + '\n' for method in methods)
+        
+        return content[:last_brace] + new_methods + content[last_brace:]
+    
+    def _format_method(self, signature: str, body: str) -> str:
+        """Format a complete method from its signature and body"""
+        
         indented_body = self._indent_code(body, 2)
         
-        method = f"""
+        return f"""
     {signature} {{
 {indented_body}
     }}
 """
-        
-        new_content = content[:last_brace] + method + '\n' + content[last_brace:]
-        
-        return new_content
     
     def _indent_code(self, code: str, levels: int) -> str:
         """Indent code by specified levels (4 spaces each)"""
-        indent = '    ' * levels
-        lines = code.split('\n')
-        return '\n'.join(indent + line if line.strip() else '' for line in lines)
+        # Whitespace-only lines are emptied rather than indented
+        return textwrap.indent(_RE_BLANK_LINE.sub('', code), '    ' * levels)
 
 
 # ============================================================================
@@ -551,12 +1127,14 @@ class SpringBootAutomation:
         mapping_file: Optional[str],
         delegate_dir: str,
         output_dir: str,
-        llm_model: str = "bedrock/amazon.nova-lite-v1:0"
+        llm_model: str = "bedrock/amazon.nova-lite-v1:0",
+        stream: bool = False,
+        use_llm: bool = True
     ):
         self.external_parser = OASParser(external_oas)
         self.internal_parser = OASParser(internal_oas)
         self.mapper = EndpointMapper(mapping_file)
-        self.code_generator = DelegateCodeGenerator(llm_model)
+        self.code_generator = DelegateCodeGenerator(llm_model, stream=stream, use_llm=use_llm)
         self.injector = JavaDelegateInjector(delegate_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -588,24 +1166,78 @@ class SpringBootAutomation:
         generated_count = 0
         failed_count = 0
         
-        for mapping in mappings:
-            ext_ep = mapping.external_endpoint
-            print(f"\n   Processing: {ext_ep.method} {ext_ep.path}")
-            print(f"   → {ext_ep.operation_id}")
+        print(f"   🔄 Generating code via LLM for {len(mappings)} mappings...")
+        method_bodies = self.code_generator.iter_method_bodies(
+            mappings,
+            internal_base_url
+        )
+        
+        # Group by delegate class so each Java file is read and written once
+        indices_by_class = defaultdict(list)
+        for idx, mapping in enumerate(mappings):
+            class_name = self._delegate_class_name(mapping.external_endpoint)
+            indices_by_class[class_name].append(idx)
+        remaining = {class_name: len(idxs) for class_name, idxs in indices_by_class.items()}
+        
+        ready_bodies = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(32, len(indices_by_class)))) as executor:
+            futures = []
+            
+            # A class is injected as soon as all of its bodies have arrived,
+            # overlapping file work with generation still in flight
+            for idx, method_body in method_bodies:
+                ready_bodies[idx] = method_body
+                class_name = self._delegate_class_name(mappings[idx].external_endpoint)
+                remaining[class_name] -= 1
+                if remaining[class_name] == 0:
+                    class_mappings = [
+                        (mappings[i], ready_bodies[i]) for i in indices_by_class[class_name]
+                    ]
+                    futures.append(executor.submit(self._process_class, class_name, class_mappings))
             
+            for future in as_completed(futures):
+                for mapping, result in future.result():
+                    ext_ep = mapping.external_endpoint
+                    print(f"\n   Processing: {ext_ep.method} {ext_ep.path}")
+                    print(f"   → {ext_ep.operation_id}")
+                    
+                    if isinstance(result, Exception):
+                        print(f"     ❌ Failed: {result}")
+                        failed_count += 1
+                    else:
+                        print(f"     ✅ Success! Updated {result}")
+                        generated_count += 1
+        
+        self.injector.commit_all()
+        
+        # Summary
+        print("\n" + "=" * 80)
+        print("GENERATION COMPLETE")
+        print("=" * 80)
+        print(f"✅ Successfully generated: {generated_count}")
+        print(f"❌ Failed: {failed_count}")
+        print(f"📁 Delegate classes updated in: {self.injector.delegate_dir}")
+    
+    def _delegate_class_name(self, endpoint: Endpoint) -> str:
+        """Determine delegate class name for an endpoint"""
+        return f"{endpoint.tag.capitalize()}ApiDelegateImpl"
+    
+    def _process_class(
+        self,
+        class_name: str,
+        class_mappings: List[Tuple[EndpointMapping, str]]
+    ) -> List[Tuple[EndpointMapping, Any]]:
+        """Inject every generated method for one delegate class"""
+        
+        try:
+            self.injector.begin(class_name)
+        except Exception as e:
+            return [(mapping, e) for mapping, _ in class_mappings]
+        
+        results = []
+        for mapping, method_body in class_mappings:
+            ext_ep = mapping.external_endpoint
             try:
-                # Generate method body
-                print(f"     🔄 Generating code via LLM...")
-                method_body = self.code_generator.generate_method_body(
-                    mapping,
-                    internal_base_url
-                )
-                
-                # Determine delegate class name
-                class_name = f"{ext_ep.tag.capitalize()}ApiDelegateImpl"
-                
-                # Inject into delegate
-                print(f"     💉 Injecting into {class_name}...")
                 file_path = self.injector.inject_method(
                     class_name=class_name,
                     method_name=ext_ep.operation_id,
@@ -613,183 +1245,161 @@ class SpringBootAutomation:
                     return_type=ext_ep.response_type or '?',
                     method_body=method_body
                 )
-                
-                print(f"     ✅ Success! Updated {file_path}")
-                generated_count += 1
-                
+                results.append((mapping, file_path))
             except Exception as e:
-                print(f"     ❌ Failed: {e}")
-                failed_count += 1
+                results.append((mapping, e))
         
-        # Summary
-        print("\n" + "=" * 80)
-        print("GENERATION COMPLETE")
-        print("=" * 80)
-        print(f"✅ Successfully generated: {generated_count}")
-        print(f"❌ Failed: {failed_count}")
-        print(f"📁 Delegate classes updated in: {self.injector.delegate_dir}")
+        return results
 
 
 # ============================================================================
 # EXAMPLE / SETUP
 # ============================================================================
 
-def create_example_files():
-    """Create example OAS and mapping files"""
-    
-    example_dir = Path("./example_project")
-    example_dir.mkdir(exist_ok=True)
-    
-    # External OAS
-    external_oas = {
-        "openapi": "3.0.0",
-        "info": {
-            "title": "User Management API",
-            "version": "1.0.0"
-        },
-        "servers": [
-            {"url": "http://localhost:8080"}
-        ],
-        "paths": {
-            "/api/users/{userId}": {
-                "get": {
-                    "tags": ["users"],
-                    "operationId": "getUserById",
-                    "summary": "Get user by ID",
-                    "parameters": [
-                        {
-                            "name": "userId",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "string"}
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "User found",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "$ref": "#/components/schemas/User"
-                                    }
-                                }
-                            }
-                        },
-                        "404": {
-                            "description": "User not found"
+# Example payloads live as JSON text parsed once at import rather than dict
+# literals rebuilt on every call
+_EXTERNAL_OAS_JSON = r"""{
+    "openapi": "3.0.0",
+    "info": {
+        "title": "User Management API",
+        "version": "1.0.0"
+    },
+    "servers": [
+        {
+            "url": "http://localhost:8080"
+        }
+    ],
+    "paths": {
+        "/api/users/{userId}": {
+            "get": {
+                "tags": [
+                    "users"
+                ],
+                "operationId": "getUserById",
+                "summary": "Get user by ID",
+                "parameters": [
+                    {
+                        "name": "userId",
+                        "in": "path",
+                        "required": true,
+                        "schema": {
+                            "type": "string"
                         }
                     }
-                }
-            },
-            "/api/users": {
-                "post": {
-                    "tags": ["users"],
-                    "operationId": "createUser",
-                    "summary": "Create new user",
-                    "requestBody": {
-                        "required": True,
+                ],
+                "responses": {
+                    "200": {
+                        "description": "User found",
                         "content": {
                             "application/json": {
                                 "schema": {
-                                    "$ref": "#/components/schemas/CreateUserRequest"
+                                    "$ref": "#/components/schemas/User"
                                 }
                             }
                         }
                     },
-                    "responses": {
-                        "201": {
-                            "description": "User created",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "$ref": "#/components/schemas/User"
-                                    }
+                    "404": {
+                        "description": "User not found"
+                    }
+                }
+            }
+        },
+        "/api/users": {
+            "post": {
+                "tags": [
+                    "users"
+                ],
+                "operationId": "createUser",
+                "summary": "Create new user",
+                "requestBody": {
+                    "required": true,
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "$ref": "#/components/schemas/CreateUserRequest"
+                            }
+                        }
+                    }
+                },
+                "responses": {
+                    "201": {
+                        "description": "User created",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/User"
                                 }
                             }
                         }
                     }
                 }
             }
-        },
-        "components": {
-            "schemas": {
-                "User": {
-                    "type": "object",
-                    "properties": {
-                        "id": {"type": "string"},
-                        "name": {"type": "string"},
-                        "email": {"type": "string"}
+        }
+    },
+    "components": {
+        "schemas": {
+            "User": {
+                "type": "object",
+                "properties": {
+                    "id": {
+                        "type": "string"
+                    },
+                    "name": {
+                        "type": "string"
+                    },
+                    "email": {
+                        "type": "string"
                     }
-                },
-                "CreateUserRequest": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string"},
-                        "email": {"type": "string"}
+                }
+            },
+            "CreateUserRequest": {
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string"
+                    },
+                    "email": {
+                        "type": "string"
                     }
                 }
             }
         }
     }
-    
-    # Internal OAS
-    internal_oas = {
-        "openapi": "3.0.0",
-        "info": {
-            "title": "Internal User Service",
-            "version": "1.0.0"
-        },
-        "servers": [
-            {"url": "http://internal-service:9090"}
-        ],
-        "paths": {
-            "/internal/v1/users/{id}": {
-                "get": {
-                    "operationId": "fetchUserById",
-                    "summary": "Fetch user details",
-                    "parameters": [
-                        {
-                            "name": "id",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "string"}
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "Success",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "$ref": "#/components/schemas/UserDetail"
-                                    }
-                                }
-                            }
+}"""
+
+_INTERNAL_OAS_JSON = r"""{
+    "openapi": "3.0.0",
+    "info": {
+        "title": "Internal User Service",
+        "version": "1.0.0"
+    },
+    "servers": [
+        {
+            "url": "http://internal-service:9090"
+        }
+    ],
+    "paths": {
+        "/internal/v1/users/{id}": {
+            "get": {
+                "operationId": "fetchUserById",
+                "summary": "Fetch user details",
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": true,
+                        "schema": {
+                            "type": "string"
                         }
                     }
-                }
-            },
-            "/internal/v1/users": {
-                "post": {
-                    "operationId": "registerUser",
-                    "summary": "Register new user",
-                    "requestBody": {
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Success",
                         "content": {
                             "application/json": {
                                 "schema": {
-                                    "$ref": "#/components/schemas/UserRegistration"
-                                }
-                            }
-                        }
-                    },
-                    "responses": {
-                        "201": {
-                            "description": "Created",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "$ref": "#/components/schemas/UserDetail"
-                                    }
+                                    "$ref": "#/components/schemas/UserDetail"
                                 }
                             }
                         }
@@ -797,54 +1407,122 @@ def create_example_files():
                 }
             }
         },
-        "components": {
-            "schemas": {
-                "UserDetail": {
-                    "type": "object",
-                    "properties": {
-                        "id": {"type": "string"},
-                        "fullName": {"type": "string"},
-                        "emailAddress": {"type": "string"}
+        "/internal/v1/users": {
+            "post": {
+                "operationId": "registerUser",
+                "summary": "Register new user",
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "$ref": "#/components/schemas/UserRegistration"
+                            }
+                        }
                     }
                 },
-                "UserRegistration": {
-                    "type": "object",
-                    "properties": {
-                        "fullName": {"type": "string"},
-                        "emailAddress": {"type": "string"}
+                "responses": {
+                    "201": {
+                        "description": "Created",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/UserDetail"
+                                }
+                            }
+                        }
                     }
                 }
             }
         }
-    }
-    
-    # Mapping file
-    mapping = {
-        "mappings": [
-            {
-                "external_operation_id": "getUserById",
-                "internal_operation_id": "fetchUserById",
-                "param_mapping": {
-                    "userId": "id"
+    },
+    "components": {
+        "schemas": {
+            "UserDetail": {
+                "type": "object",
+                "properties": {
+                    "id": {
+                        "type": "string"
+                    },
+                    "fullName": {
+                        "type": "string"
+                    },
+                    "emailAddress": {
+                        "type": "string"
+                    }
                 }
             },
-            {
-                "external_operation_id": "createUser",
-                "internal_operation_id": "registerUser",
-                "param_mapping": {
-                    "body": "body"
+            "UserRegistration": {
+                "type": "object",
+                "properties": {
+                    "fullName": {
+                        "type": "string"
+                    },
+                    "emailAddress": {
+                        "type": "string"
+                    }
                 }
             }
-        ]
+        }
     }
+}"""
+
+_MAPPING_JSON = r"""{
+    "mappings": [
+        {
+            "external_operation_id": "getUserById",
+            "internal_operation_id": "fetchUserById",
+            "param_mapping": {
+                "userId": "id"
+            }
+        },
+        {
+            "external_operation_id": "createUser",
+            "internal_operation_id": "registerUser",
+            "param_mapping": {
+                "body": "body"
+            }
+        }
+    ]
+}"""
+
+
+def _fragment_pool():
+    """json object_hook that returns one shared instance per distinct sub-dict
     
-    # Sample delegate class
-    delegate_class = """package com.example.api.delegate;
+    Hooks run bottom-up, so nested dicts are already shared and can be keyed
+    by identity. Payloads built this way must be treated as read-only.
+    """
+    pool = {}
+    
+    def share(obj: Dict[str, Any]) -> Dict[str, Any]:
+        key = tuple(
+            (k, id(v) if isinstance(v, (dict, list)) else v)
+            for k, v in obj.items()
+        )
+        return pool.setdefault(key, obj)
+    
+    return share
+
+
+# Repeated fragments such as {"type": "string"} become a single object
+_share_fragment = _fragment_pool()
+_EXTERNAL_OAS = json.loads(_EXTERNAL_OAS_JSON, object_hook=_share_fragment)
+_INTERNAL_OAS = json.loads(_INTERNAL_OAS_JSON, object_hook=_share_fragment)
+_MAPPING = json.loads(_MAPPING_JSON, object_hook=_share_fragment)
+del _share_fragment
+
+# Sample delegate class
+_DELEGATE_BYTES = b"""package com.example.api.delegate;
 
 import com.example.api.model.*;
+import java.net.URI;
+import org.springframework.http.HttpMethod;
 import org.springframework.http.ResponseEntity;
 import org.springframework.stereotype.Component;
 import org.springframework.web.reactive.function.client.WebClient;
+import org.springframework.web.reactive.function.client.WebClientResponseException;
+import org.springframework.web.util.UriComponentsBuilder;
+import reactor.core.publisher.Mono;
 import lombok.RequiredArgsConstructor;
 import lombok.extern.slf4j.Slf4j;
 
@@ -860,39 +1538,149 @@ public class UsersApiDelegateImpl implements UsersApiDelegate {
     
 }
 """
+
+
+_RE_PLAIN_SCALAR = re.compile(r'[A-Za-z_/][A-Za-z0-9_./{} -]*')
+_YAML_RESERVED = frozenset({'true', 'false', 'yes', 'no', 'on', 'off', 'null', 'y', 'n'})
+_INDENTS: Dict[int, str] = {}
+
+
+def _yaml_scalar(value: Any) -> str:
+    """Render a scalar, quoting strings that YAML would read as another type"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if (_RE_PLAIN_SCALAR.fullmatch(value) and not value.endswith(' ')
+            and value.lower() not in _YAML_RESERVED):
+        return value
+    # A JSON string is a valid YAML double-quoted scalar
+    if orjson is not None:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _fast_yaml_dump(obj: Any, file, indent: int = 0, lead: Optional[str] = None):
+    """Write dicts, lists and scalars as block-style YAML
+    
+    Only covers the types used by the example specs, which avoids PyYAML's
+    representer/resolver machinery. `lead` replaces the indentation of the
+    first line so a mapping can start on a "- " list line.
+    """
+    pad = _INDENTS.get(indent)
+    if pad is None:
+        pad = _INDENTS[indent] = ' ' * indent
     
-    # Write files
-    with open(example_dir / "external.yaml", "w") as f:
-        yaml.dump(external_oas, f, sort_keys=False)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            prefix = lead if lead is not None else pad
+            lead = None
+            key = _yaml_scalar(key)
+            if isinstance(value, dict) and value:
+                file.write(f"{prefix}{key}:\n")
+                _fast_yaml_dump(value, file, indent + 2)
+            elif isinstance(value, list) and value:
+                file.write(f"{prefix}{key}:\n")
+                _fast_yaml_dump(value, file, indent)
+            else:
+                file.write(f"{prefix}{key}: {_yaml_flow(value)}\n")
+    elif isinstance(obj, list):
+        for item in obj:
+            if isinstance(item, dict) and item:
+                _fast_yaml_dump(item, file, indent + 2, lead=f"{pad}- ")
+            elif isinstance(item, list) and item:
+                file.write(f"{pad}-\n")
+                _fast_yaml_dump(item, file, indent + 2)
+            else:
+                file.write(f"{pad}- {_yaml_flow(item)}\n")
+    else:
+        file.write(f"{pad}{_yaml_flow(obj)}\n")
+
+
+def _yaml_flow(value: Any) -> str:
+    """Render an inline value: a scalar or an empty collection"""
+    if isinstance(value, dict):
+        return '{}'
+    if isinstance(value, list):
+        return '[]'
+    return _yaml_scalar(value)
+
+
+def _dump_yaml_bytes(obj: Any) -> bytes:
+    """Serialize to UTF-8 YAML in memory"""
+    buf = io.StringIO()
+    _fast_yaml_dump(obj, buf)
+    return buf.getvalue().encode('utf-8')
+
+
+def _write_file_bytes(path: Path, data: bytes) -> bool:
+    """Write a pre-serialized buffer, normally with a single os.write
     
-    with open(example_dir / "internal.yaml", "w") as f:
-        yaml.dump(internal_oas, f, sort_keys=False)
+    Returns False without touching the file when it already holds `data`.
+    """
+    try:
+        # Size check first so differing files are rarely read at all
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
     
-    with open(example_dir / "mapping.yaml", "w") as f:
-        yaml.dump(mapping, f, sort_keys=False)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    return True
+
+
+_SETUP_REPORT = """✅ Example files created in ./example_project/
+
+Files created:
+  📄 external.yaml - External API specification
+  📄 internal.yaml - Internal API specification
+  📄 mapping.yaml - Endpoint mappings
+  📄 delegates/UsersApiDelegateImpl.java - Sample delegate class
+
+Next steps:
+  1. Install dependencies: pip install litellm pyyaml boto3
+  2. Configure AWS credentials for Bedrock
+  3. Run: python generate_logic.py
+"""
+
+# The example files never change, so serialize them once at import
+_EXTERNAL_OAS_YAML = _dump_yaml_bytes(_EXTERNAL_OAS)
+_INTERNAL_OAS_YAML = _dump_yaml_bytes(_INTERNAL_OAS)
+_MAPPING_YAML = _dump_yaml_bytes(_MAPPING)
+
+
+def create_example_files():
+    """Create example OAS and mapping files"""
     
-    # Create delegate directory
-    delegate_dir = example_dir / "delegates"
-    delegate_dir.mkdir(exist_ok=True)
+    # Creating the delegate directory creates the example project with it
+    delegate_dir = Path("./example_project/delegates")
+    delegate_dir.mkdir(parents=True, exist_ok=True)
+    example_dir = delegate_dir.parent
     
-    with open(delegate_dir / "UsersApiDelegateImpl.java", "w") as f:
-        f.write(delegate_class)
+    # Write files; the paths are independent, so the writes overlap
+    files = [
+        (example_dir / "external.yaml", _EXTERNAL_OAS_YAML),
+        (example_dir / "internal.yaml", _INTERNAL_OAS_YAML),
+        (example_dir / "mapping.yaml", _MAPPING_YAML),
+        (delegate_dir / "UsersApiDelegateImpl.java", _DELEGATE_BYTES),
+    ]
+    with ThreadPoolExecutor(max_workers=len(files)) as executor:
+        list(executor.map(lambda file: _write_file_bytes(*file), files))
     
-    print("✅ Example files created in ./example_project/")
-    print("\nFiles created:")
-    print("  📄 external.yaml - External API specification")
-    print("  📄 internal.yaml - Internal API specification")
-    print("  📄 mapping.yaml - Endpoint mappings")
-    print("  📄 delegates/UsersApiDelegateImpl.java - Sample delegate class")
-    print("\nNext steps:")
-    print("  1. Install dependencies: pip install litellm pyyaml boto3")
-    print("  2. Configure AWS credentials for Bedrock")
-    print("  3. Run: python generate_logic.py")
+    sys.stdout.write(_SETUP_REPORT)
 
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) > 1 and sys.argv[1] == "setup":
         create_example_files()
     elif len(sys.argv) > 1 and sys.argv[1] == "run":
@@ -902,10 +1690,16 @@ if __name__ == "__main__":
             internal_oas="./example_project/internal.yaml",
             mapping_file="./example_project/mapping.yaml",
             delegate_dir="./example_project/delegates",
-            output_dir="./example_project/output"
+            output_dir="./example_project/output",
+            stream="--stream" in sys.argv,
+            use_llm="--no-llm" not in sys.argv
         )
         automation.run()
     else:
         print("Spring Boot Delegate Auto-Generation")
         print("\nUsage:")
         print("  python generate_logic.py setup  - Create example files")
+        print("  python generate_logic.py run    - Generate delegate methods")
+        print("\nOptions for run:")
+        print("  --stream   Stream LLM responses and inject classes as they complete")
+        print("  --no-llm   Template-only generation; skips importing litellm")
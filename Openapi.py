@@ -1,83 +1,41 @@
 # api_bridge_generator.py
 import json
 import yaml
+import functools
+import hashlib
+import mmap
 import os
-import shutil
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Tuple
 import subprocess
 import sys
 import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used when missing
+    orjson = None
 
-class APIBridgeGenerator:
-    """
-    Generates runnable Spring Boot code that bridges external and internal APIs.
-    """
-    
-    def __init__(self, external_oas_path: str, internal_oas_path: str, output_dir: str):
-        self.external_oas_path = external_oas_path
-        self.internal_oas_path = internal_oas_path
-        self.output_dir = output_dir
-        self.template_dir = os.path.join(output_dir, "templates")
-        self.generated_dir = os.path.join(output_dir, "generated")
-        self.external_spec = self._load_spec(external_oas_path)
-        self.internal_spec = self._load_spec(internal_oas_path)
-        
-    def _load_spec(self, path: str) -> Dict[str, Any]:
-        """Load OAS file (JSON or YAML)"""
-        with open(path, 'r') as f:
-            if path.endswith('.json'):
-                return json.load(f)
-            else:
-                return yaml.safe_load(f)
-    
-    def _get_java_type(self, schema_type: str, schema_format: str = None) -> str:
-        """Convert OpenAPI type to Java type"""
-        type_mapping = {
-            'string': 'String',
-            'integer': 'Integer' if schema_format != 'int64' else 'Long',
-            'number': 'Double' if schema_format == 'double' else 'Float',
-            'boolean': 'Boolean',
-            'array': 'List',
-            'object': 'Object'
-        }
-        return type_mapping.get(schema_type, 'Object')
-    
-    def _extract_operations(self, spec: Dict[str, Any]) -> List[Dict]:
-        """Extract all operations from OpenAPI spec"""
-        operations = []
-        paths = spec.get('paths', {})
-        
-        for path, path_item in paths.items():
-            for method in ['get', 'post', 'put', 'delete', 'patch']:
-                if method in path_item:
-                    operation = path_item[method]
-                    operations.append({
-                        'path': path,
-                        'method': method,
-                        'operationId': operation.get('operationId', f"{method}_{path.replace('/', '_').replace('{', '').replace('}', '')}"),
-                        'summary': operation.get('summary', ''),
-                        'parameters': operation.get('parameters', []),
-                        'requestBody': operation.get('requestBody', {}),
-                        'responses': operation.get('responses', {})
-                    })
-        
-        return operations
-    
-    def _create_templates(self):
-        """Create all necessary Mustache templates"""
-        os.makedirs(self.template_dir, exist_ok=True)
-        
-        # API Controller template
-        api_template = """package {{package}};
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+try:
+    import jinja2
+except ImportError:  # optional, plain substitution is used when missing
+    jinja2 = None
+
+
+# Mustache templates consumed by OpenAPI Generator, kept as ready-to-write bytes
+_API_MUSTACHE = b"""package {{package}};
 
 import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.http.ResponseEntity;
 import org.springframework.web.bind.annotation.*;
-{{#reactive}}
 import reactor.core.publisher.Mono;
-{{/reactive}}
 {{#imports}}
 import {{import}};
 {{/imports}}
@@ -95,89 +53,342 @@ public class {{classname}} {
 {{#operation}}
 
     @{{httpMethod}}("{{path}}")
-    public {{#reactive}}Mono<{{/reactive}}ResponseEntity<{{#returnType}}{{{returnType}}}{{/returnType}}{{^returnType}}Void{{/returnType}}>{{#reactive}}>{{/reactive}} {{operationId}}(
+    public Mono<ResponseEntity<{{#returnType}}{{{returnType}}}{{/returnType}}{{^returnType}}Void{{/returnType}}>> {{operationId}}(
             {{#allParams}}@{{#isPathParam}}PathVariable{{/isPathParam}}{{#isQueryParam}}RequestParam{{/isQueryParam}}{{#isHeaderParam}}RequestHeader{{/isHeaderParam}}{{#isBodyParam}}RequestBody{{/isBodyParam}}{{#hasMore}} {{/hasMore}}{{{dataType}}} {{paramName}}{{^-last}},
             {{/-last}}{{/allParams}}{{^hasParams}}{{/hasParams}}) {
         {{#returnType}}return {{/returnType}}{{^returnType}}{{/returnType}}service.{{operationId}}({{#allParams}}{{paramName}}{{^-last}}, {{/-last}}{{/allParams}});
-        {{^returnType}}return {{#reactive}}Mono.just({{/reactive}}ResponseEntity.ok().build(){{#reactive}}){{/reactive}};{{/returnType}}
+        {{^returnType}}return Mono.just(ResponseEntity.ok().build());{{/returnType}}
     }
 {{/operation}}
 }
 {{/operations}}
 """
-        
-        with open(os.path.join(self.template_dir, "api.mustache"), 'w') as f:
-            f.write(api_template)
-        
-        # POM template
-        pom_template = """<?xml version="1.0" encoding="UTF-8"?>
-<project xmlns="http://maven.apache.org/POM/4.0.0"
-         xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-         xsi:schemaLocation="http://maven.apache.org/POM/4.0.0 
-         http://maven.apache.org/xsd/maven-4.0.0.xsd">
-    <modelVersion>4.0.0</modelVersion>
-
-    <groupId>{{groupId}}</groupId>
-    <artifactId>{{artifactId}}</artifactId>
-    <version>{{artifactVersion}}</version>
-    <packaging>jar</packaging>
-
-    <parent>
-        <groupId>org.springframework.boot</groupId>
-        <artifactId>spring-boot-starter-parent</artifactId>
-        <version>3.2.0</version>
-    </parent>
-
-    <properties>
-        <java.version>17</java.version>
-    </properties>
-
-    <dependencies>
-        <dependency>
-            <groupId>org.springframework.boot</groupId>
-            <artifactId>spring-boot-starter-web</artifactId>
-        </dependency>
-        <dependency>
-            <groupId>org.springframework.boot</groupId>
-            <artifactId>spring-boot-starter-webflux</artifactId>
-        </dependency>
-        <dependency>
-            <groupId>io.swagger.core.v3</groupId>
-            <artifactId>swagger-annotations</artifactId>
-            <version>2.2.20</version>
-        </dependency>
-        <dependency>
-            <groupId>org.openapitools</groupId>
-            <artifactId>jackson-databind-nullable</artifactId>
-            <version>0.2.6</version>
-        </dependency>
-        <dependency>
-            <groupId>com.fasterxml.jackson.datatype</groupId>
-            <artifactId>jackson-datatype-jsr310</artifactId>
-        </dependency>
-        <dependency>
-            <groupId>jakarta.validation</groupId>
-            <artifactId>jakarta.validation-api</artifactId>
-        </dependency>
-        <dependency>
-            <groupId>jakarta.annotation</groupId>
-            <artifactId>jakarta.annotation-api</artifactId>
-        </dependency>
-    </dependencies>
-
-    <build>
-        <plugins>
-            <plugin>
-                <groupId>org.springframework.boot</groupId>
-                <artifactId>spring-boot-maven-plugin</artifactId>
-            </plugin>
-        </plugins>
-    </build>
-</project>
+
+_WEBCLIENT_CONFIG_JAVA = b"""package com.generated.config;
+
+import org.springframework.context.annotation.Bean;
+import org.springframework.context.annotation.Configuration;
+import org.springframework.web.reactive.function.client.WebClient;
+
+@Configuration
+public class WebClientConfig {
+    
+    @Bean
+    public WebClient.Builder webClientBuilder() {
+        return WebClient.builder();
+    }
+}
 """
+
+_APPLICATION_JAVA = b"""package com.generated;
+
+import org.springframework.boot.SpringApplication;
+import org.springframework.boot.autoconfigure.SpringBootApplication;
+
+@SpringBootApplication
+public class Application {
+    
+    public static void main(String[] args) {
+        SpringApplication.run(Application.class, args);
+    }
+}
+"""
+
+# Rendered in-process into src/main/resources/application.properties
+_APPLICATION_PROPERTIES_J2 = """server.port=8080
+internal.api.base-url={{ internal_base_url }}
+logging.level.com.generated=DEBUG
+"""
+
+# Generated service class, filled with str.format; operations are rendered
+# from _SERVICE_METHOD with fields prepared by _service_method_fields
+_SERVICE_HEADER = """package com.generated.service;
+
+import java.net.URI;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.http.ResponseEntity;
+import org.springframework.stereotype.Service;
+import org.springframework.util.LinkedMultiValueMap;
+import org.springframework.web.reactive.function.client.WebClient;
+import reactor.core.publisher.Mono;
+import com.generated.model.*;
+
+@Service
+public class {class_name}ApiService {{
+
+    private final WebClient webClient;
+    
+    // Parsed once at injection time; Spring converts the property to a URI
+    @Value("${{internal.api.base-url:{base_url}}}")
+    private URI internalApiBaseUri;
+    
+    public {class_name}ApiService(WebClient.Builder webClientBuilder) {{
+        this.webClient = webClientBuilder.build();
+    }}
+"""
+
+_SERVICE_METHOD = """
+    public Mono<ResponseEntity<{return_type}>> {operation_id}({params}) {{
+        return webClient
+            .method(org.springframework.http.HttpMethod.{http_method})
+{uri}{body}            .retrieve()
+            .toEntity({return_type}.class);
+    }}
+"""
+
+_SERVICE_URI = """            .uri(uriBuilder -> uriBuilder
+{calls})
+"""
+
+_SERVICE_URI_QUERY = """            .uri(uriBuilder -> {{
+                LinkedMultiValueMap<String, String> qp = new LinkedMultiValueMap<>();
+{query_lines}                return uriBuilder
+{calls};
+            }})
+"""
+
+# (file name, body) pairs written into template_dir
+_TEMPLATES: List[Tuple[str, bytes]] = [
+    ("api.mustache", _API_MUSTACHE),
+]
+
+# Content hashes recorded in the output manifest to detect stale templates
+_TEMPLATE_DIGESTS: Dict[str, str] = {
+    name: hashlib.blake2b(data, digest_size=16).hexdigest() for name, data in _TEMPLATES
+}
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    """Write data to path unless the file already holds identical bytes"""
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _jinja_env(cache_dir: str):
+    """Jinja2 environment whose compiled templates persist across runs in cache_dir"""
+    os.makedirs(cache_dir, exist_ok=True)
+    return jinja2.Environment(
+        loader=jinja2.DictLoader({"application.properties.j2": _APPLICATION_PROPERTIES_J2}),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(cache_dir),
+        # Templates are in-memory constants, so skip the per-render staleness check
+        auto_reload=False,
+        cache_size=400,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+    )
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON with orjson when installed, stdlib json otherwise"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON with orjson when installed, stdlib json otherwise"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+def _store_spec_cache(cache_file: str, digest: str, spec: Any):
+    """Persist a parsed spec as JSON, unless JSON cannot represent it exactly"""
+    try:
+        encoded = _json_dumps({"hash": digest, "data": spec})
+    except (TypeError, ValueError):  # e.g. YAML timestamps
+        return
+    # Non-string keys (such as unquoted response codes) would come back as strings
+    if _json_loads(encoded)["data"] != spec:
+        return
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(encoded)
+    os.replace(tmp_file, cache_file)
+
+
+def _write_all(files: List[Tuple[Path, bytes]]) -> List[bool]:
+    """Write independent files concurrently so their I/O latency overlaps"""
+    with ThreadPoolExecutor(max_workers=len(files) or 1) as executor:
+        return list(executor.map(lambda item: _write_if_changed(*item), files))
+
+
+@dataclass(slots=True, frozen=True)
+class Operation:
+    """One HTTP operation of an OAS document"""
+    path: str
+    method: str
+    operation_id: str
+    summary: str
+    parameters: List[Dict[str, Any]]
+    request_body: Dict[str, Any]
+    responses: Dict[str, Any]
+
+
+# OpenAPI type -> Java type; integer and number also depend on the format
+_TYPE_MAP = {
+    'string': 'String',
+    'boolean': 'Boolean',
+    'array': 'List',
+    'object': 'Object',
+}
+_INT_FORMATS = {'int64': 'Long'}
+_NUMBER_FORMATS = {'double': 'Double'}
+
+# First non-whitespace byte of a spec; '{' means JSON
+_RE_FIRST_NON_WS = re.compile(rb'\S')
+
+# Controller fix-up patterns
+_RE_CLASS = re.compile(r'public class (\w+)')
+_RE_CLASS_DECL = re.compile(r'(public class \w+ \{)')
+# Either a method signature (group 1 = name) or a NOT_IMPLEMENTED stub body
+_RE_METHOD_OR_STUB = re.compile(
+    r'public \w+<?\w*>? (\w+)\(|return new ResponseEntity<>\(HttpStatus\.NOT_IMPLEMENTED\);'
+)
+
+
+def _validate_spec_file(path: str) -> str:
+    """Cheap pre-parse checks on a spec file; returns an error message or ''"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"Spec file not found: {path}"
+    if st.st_size == 0:
+        return f"Spec file is empty: {path}"
+    if not os.access(path, os.R_OK):
+        return f"Spec file is not readable: {path}"
+    return ''
+
+
+class APIBridgeGenerator:
+    """
+    Generates runnable Spring Boot code that bridges external and internal APIs.
+    """
+    
+    GENERATOR_IMAGE = "openapitools/openapi-generator-cli"
+    
+    def __init__(self, external_oas_path: str, internal_oas_path: str, output_dir: str,
+                 reuse_container: bool = False):
+        self.external_oas_path = external_oas_path
+        self.internal_oas_path = internal_oas_path
+        self.output_dir = output_dir
+        self.reuse_container = reuse_container
+        base = Path(output_dir)
+        self.template_dir = base / "templates"
+        self.generated_dir = base / "generated"
+        self.app_dir = self.generated_dir / "src/main/java/com/generated"
+        self.service_dir = self.app_dir / "service"
+        self.config_dir = self.app_dir / "config"
+        self.resources_dir = self.generated_dir / "src/main/resources"
+        self.external_abs = os.path.abspath(external_oas_path)
+        self.internal_abs = os.path.abspath(internal_oas_path)
+        self.output_abs = os.path.abspath(output_dir)
+        self.generated_abs = os.path.join(self.output_abs, "generated")
+        self.template_abs = os.path.join(self.output_abs, "templates")
+        self.external_spec = self._load_spec(self.external_abs)
+        self.internal_spec = self._load_spec(self.internal_abs)
+        self.internal_base_url = (self.internal_spec.get('servers') or [{}])[0].get('url', 'http://localhost:8081')
+        
+    def _load_spec(self, path: str) -> Dict[str, Any]:
+        """Load OAS file (JSON or YAML), reusing the parse while the file is unchanged"""
+        st = os.stat(path)
+        cache_dir = os.path.join(self.output_abs, ".speccache")
+        return self._load_spec_cached(path, st.st_mtime_ns, st.st_size, cache_dir)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _load_spec_cached(path: str, mtime_ns: int, size: int, cache_dir: str) -> Dict[str, Any]:
+        """Parse an OAS file; mtime and size only serve as cache key"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        # Dispatch on content rather than extension: JSON documents open with '{'
+        first = _RE_FIRST_NON_WS.search(data)
+        if first is not None and first.group() == b'{':
+            return _json_loads(data)
+        
+        # YAML parses ~10x slower than JSON, so keep a JSON copy keyed by content hash
+        digest = hashlib.sha256(data).hexdigest()
+        cache_file = os.path.join(cache_dir, f"{digest}.json")
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = f.read()
+            payload = _json_loads(cached)
+            if payload.get("hash") == digest:
+                return payload["data"]
+        except (OSError, ValueError):
+            pass
+        
+        spec = yaml.load(data, Loader=SafeLoader)
+        _store_spec_cache(cache_file, digest, spec)
+        return spec
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_java_type(schema_type: str, schema_format: str = None) -> str:
+        """Convert OpenAPI type to Java type"""
+        if schema_type == 'integer':
+            return _INT_FORMATS.get(schema_format, 'Integer')
+        if schema_type == 'number':
+            return _NUMBER_FORMATS.get(schema_format, 'Float')
+        return _TYPE_MAP.get(schema_type, 'Object')
+    
+    def _iter_operations(self, spec: Dict[str, Any]) -> Iterator[Operation]:
+        """Yield all operations from OpenAPI spec"""
+        paths = spec.get('paths', {})
         
-        with open(os.path.join(self.template_dir, "pom.mustache"), 'w') as f:
-            f.write(pom_template)
+        for path, path_item in paths.items():
+            for method in ('get', 'post', 'put', 'delete', 'patch'):
+                if method in path_item:
+                    operation = path_item[method]
+                    # Only build the fallback id when the spec does not provide one
+                    if 'operationId' in operation:
+                        operation_id = operation['operationId']
+                    else:
+                        operation_id = f"{method}_{path.replace('/', '_').replace('{', '').replace('}', '')}"
+                    yield Operation(
+                        path=path,
+                        method=method,
+                        operation_id=operation_id,
+                        summary=operation.get('summary', ''),
+                        parameters=operation.get('parameters', []),
+                        request_body=operation.get('requestBody', {}),
+                        responses=operation.get('responses', {})
+                    )
+    
+    def _create_templates(self):
+        """Create all necessary Mustache templates"""
+        manifest_path = Path(self.output_dir, ".template_manifest.json")
+        try:
+            manifest = _json_loads(manifest_path.read_bytes())
+        except (FileNotFoundError, ValueError):
+            manifest = {}
+        
+        # Only templates whose recorded hash differs (or that went missing) are rewritten
+        template_dir = self.template_dir
+        stale = [
+            (template_dir / name, data) for name, data in _TEMPLATES
+            if manifest.get(name) != _TEMPLATE_DIGESTS[name] or not (template_dir / name).exists()
+        ]
+        if stale:
+            _write_all(stale)
+        
+        if manifest != _TEMPLATE_DIGESTS:
+            tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+            tmp_path.write_bytes(_json_dumps(_TEMPLATE_DIGESTS, indent=True))
+            os.replace(tmp_path, manifest_path)
+    
+    def _ensure_dirs(self):
+        """Create every output directory up front in one pass"""
+        for path in (self.template_dir, self.service_dir, self.config_dir, self.resources_dir):
+            path.mkdir(parents=True, exist_ok=True)
     
     def generate(self):
         """Main generation workflow"""
@@ -185,25 +396,34 @@ public class {{classname}} {
         print("API BRIDGE GENERATOR - Spring Boot Code Generation")
         print("=" * 70)
         
+        self._ensure_dirs()
+        
         # Step 1: Create templates
         print("\n[1/5] Creating Mustache templates...")
         self._create_templates()
         
-        # Step 2: Generate base code with OpenAPI Generator
-        print("[2/5] Running OpenAPI Generator...")
-        self._run_generator()
-        
-        # Step 3: Generate service classes
-        print("[3/5] Generating service classes...")
-        self._generate_service_classes()
+        # Steps 2 and 3 overlap: the generator never writes the service package,
+        # so local codegen proceeds while docker runs
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Step 2: Generate base code with OpenAPI Generator
+            print("[2/5] Running OpenAPI Generator...")
+            generator_run = executor.submit(self._run_generator)
+            
+            # Step 3: Generate service classes
+            print("[3/5] Generating service classes...")
+            self._generate_service_classes()
+            
+            generator_run.result()
         
-        # Step 4: Generate configuration classes
+        # Step 4: Generate configuration classes (after the generator, which
+        # writes its own application.properties and the controllers fixed in step 5)
         print("[4/5] Generating configuration classes...")
         self._generate_config_classes()
         
         # Step 5: Fix compilation errors
         print("[5/5] Fixing generated code...")
         self._fix_generated_code()
+        self._verify_generated_code()
         
         print("\n" + "=" * 70)
         print("✓ GENERATION COMPLETE!")
@@ -213,7 +433,7 @@ public class {{classname}} {
         print(f"  cd {self.generated_dir}")
         print("  ./mvnw clean spring-boot:run")
         
-        return self.generated_dir
+        return os.fspath(self.generated_dir)
     
     def _run_generator(self):
         """Run OpenAPI Generator"""
@@ -236,238 +456,276 @@ public class {{classname}} {
             }
         }
         
-        config_path = os.path.join(self.output_dir, "config.json")
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        config_path = os.path.join(self.output_abs, "config.json")
+        with open(config_path, 'wb') as f:
+            f.write(_json_dumps(config, indent=True))
+        
+        volumes = [
+            "-v", f"{os.path.dirname(self.external_abs)}:/spec:ro",
+            "-v", f"{self.generated_abs}:/out",
+            "-v", f"{config_path}:/config.json:ro",
+        ]
+        generator_args = [
+            "generate",
+            "-i", f"/spec/{os.path.basename(self.external_abs)}",
+            "-g", "spring",
+            "-o", "/out",
+            "-c", "/config.json",
+            "--additional-properties=useSpringBoot3=true,interfaceOnly=false,skipDefaultInterface=true,"
+            "groupId=com.generated,artifactId=api-bridge,artifactVersion=1.0.0"
+        ]
         
         try:
-            cmd = [
-                "docker", "run", "--rm",
-                "-v", f"{os.path.abspath(self.external_oas_path)}:/spec/api.yaml",
-                "-v", f"{os.path.abspath(self.generated_dir)}:/out",
-                "-v", f"{os.path.abspath(config_path)}:/config.json",
-                "openapitools/openapi-generator-cli", "generate",
-                "-i", "/spec/api.yaml",
-                "-g", "spring",
-                "-o", "/out",
-                "-c", "/config.json",
-                "--additional-properties=useSpringBoot3=true,interfaceOnly=false,skipDefaultInterface=true"
-            ]
+            if self.reuse_container:
+                # Exec into a long-lived container instead of paying container start-up per run
+                container = self._ensure_generator_container(volumes)
+                cmd = ["docker", "exec", container, "docker-entrypoint.sh", *generator_args]
+            else:
+                cmd = ["docker", "run", "--rm", *volumes, self.GENERATOR_IMAGE, *generator_args]
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            # Stream the generator log line by line instead of buffering it all
+            with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                  text=True, bufsize=1) as proc:
+                for line in proc.stdout:
+                    sys.stdout.write(line)
+                returncode = proc.wait()
+            if returncode:
+                raise subprocess.CalledProcessError(returncode, cmd)
             print("  ✓ Base code generated")
         except subprocess.CalledProcessError as e:
-            print(f"  Error: {e.stderr.decode()}")
+            print(f"  Error: generator exited with status {e.returncode}")
             raise
     
+    def _ensure_generator_container(self, volumes: List[str]) -> str:
+        """Return a running generator container with the given mounts, starting it if needed"""
+        # Mounts are fixed at creation, so the container name is derived from them
+        name = "oasgen-" + hashlib.blake2b("\0".join(volumes).encode("utf-8"), digest_size=6).hexdigest()
+        
+        state = subprocess.run(
+            ["docker", "inspect", "-f", "{{.State.Running}}", name],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        if state.returncode == 0:
+            if state.stdout.strip() != "true":
+                subprocess.run(["docker", "start", name], check=True, stdout=subprocess.DEVNULL)
+            return name
+        
+        subprocess.run(
+            ["docker", "run", "-d", "--name", name, *volumes,
+             "--entrypoint", "sleep", self.GENERATOR_IMAGE, "infinity"],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        return name
+    
     def _generate_service_classes(self):
         """Generate service classes for each API"""
-        operations = self._extract_operations(self.external_spec)
-        internal_operations = self._extract_operations(self.internal_spec)
+        internal_index = self._index_internal_paths(self._iter_operations(self.internal_spec))
         
-        # Group operations by tag or path
+        # Group operations by tag or path while they are extracted
         api_groups = {}
-        for op in operations:
+        for op in self._iter_operations(self.external_spec):
             # Use first path segment as group name
-            parts = op['path'].strip('/').split('/')
-            group = parts[0].capitalize() if parts else 'Default'
-            
-            if group not in api_groups:
-                api_groups[group] = []
-            api_groups[group].append(op)
+            group = op.path.strip('/').split('/', 1)[0].capitalize()
+            api_groups.setdefault(group, []).append(op)
         
-        # Generate a service class for each group
-        for group_name, group_ops in api_groups.items():
-            self._create_service_file(group_name, group_ops, internal_operations)
+        # Generate a service class for each group; files are independent, so overlap their I/O
+        if not api_groups:
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(api_groups))) as executor:
+            list(executor.map(
+                lambda group: self._create_service_file(group[0], group[1], internal_index),
+                api_groups.items()
+            ))
     
-    def _create_service_file(self, class_name: str, operations: List[Dict], internal_ops: List[Dict]):
+    def _create_service_file(self, class_name: str, operations: List[Operation], internal_index: Tuple[Dict, Dict]):
         """Create a service class file"""
-        service_dir = os.path.join(self.generated_dir, "src/main/java/com/generated/service")
-        os.makedirs(service_dir, exist_ok=True)
-        
-        internal_base_url = "http://localhost:8081"
-        if self.internal_spec.get('servers'):
-            internal_base_url = self.internal_spec['servers'][0].get('url', internal_base_url)
-        
-        service_code = f"""package com.generated.service;
-
-import org.springframework.beans.factory.annotation.Value;
-import org.springframework.http.ResponseEntity;
-import org.springframework.stereotype.Service;
-import org.springframework.web.reactive.function.client.WebClient;
-import reactor.core.publisher.Mono;
-import com.generated.model.*;
-
-@Service
-public class {class_name}ApiService {{
-
-    private final WebClient webClient;
-    
-    @Value("${{internal.api.base-url:{internal_base_url}}}")
-    private String internalApiBaseUrl;
-    
-    public {class_name}ApiService(WebClient.Builder webClientBuilder) {{
-        this.webClient = webClientBuilder.build();
-    }}
-"""
-        
-        for op in operations:
-            # Extract parameters
-            params = []
-            param_names = []
-            
-            for param in op['parameters']:
-                param_type = self._get_java_type(
-                    param.get('schema', {}).get('type', 'string'),
-                    param.get('schema', {}).get('format')
-                )
-                param_name = param['name']
-                params.append(f"{param_type} {param_name}")
-                param_names.append(param_name)
-            
-            # Check for request body
-            if op['requestBody']:
-                params.append("Object requestBody")
-                param_names.append("requestBody")
-            
-            params_str = ", ".join(params) if params else ""
-            
-            # Determine return type
-            return_type = "Object"
-            if '200' in op['responses']:
-                response_schema = op['responses']['200'].get('content', {}).get('application/json', {}).get('schema', {})
-                if response_schema:
-                    return_type = response_schema.get('$ref', 'Object').split('/')[-1] if '$ref' in response_schema else 'Object'
-            
-            # Find matching internal operation
-            internal_path = self._find_matching_internal_path(op, internal_ops)
-            
-            method_code = f"""
-    public Mono<ResponseEntity<{return_type}>> {op['operationId']}({params_str}) {{
-        return webClient
-            .method(org.springframework.http.HttpMethod.{op['method'].upper()})
-            .uri(internalApiBaseUrl + "{internal_path}")
-"""
-            
-            # Add body if present
-            if op['requestBody']:
-                method_code += """            .bodyValue(requestBody)
-"""
-            
-            method_code += f"""            .retrieve()
-            .toEntity({return_type}.class);
-    }}
-"""
-            
-            service_code += method_code
-        
-        service_code += "}\n"
+        parts = [_SERVICE_HEADER.format(class_name=class_name, base_url=self.internal_base_url)]
+        parts.extend(
+            _SERVICE_METHOD.format(**self._service_method_fields(op, internal_index))
+            for op in operations
+        )
+        parts.append("}\n")
+        service_code = "".join(parts)
         
         # Write service file
-        service_file = os.path.join(service_dir, f"{class_name}ApiService.java")
-        with open(service_file, 'w') as f:
-            f.write(service_code)
+        service_file = self.service_dir / f"{class_name}ApiService.java"
+        _write_if_changed(service_file, service_code.encode("utf-8"))
         
         print(f"  ✓ Generated {class_name}ApiService.java")
     
-    def _find_matching_internal_path(self, external_op: Dict, internal_ops: List[Dict]) -> str:
+    def _service_method_fields(self, op: Operation, internal_index: Tuple[Dict, Dict]) -> Dict[str, str]:
+        """Precompute the _SERVICE_METHOD fields for one operation"""
+        # Extract parameters
+        params = []
+        path_param_names = []
+        query_params = []
+        
+        for param in op.parameters:
+            param_type = self._get_java_type(
+                param.get('schema', {}).get('type', 'string'),
+                param.get('schema', {}).get('format')
+            )
+            param_name = param['name']
+            params.append(f"{param_type} {param_name}")
+            if param.get('in') == 'path':
+                path_param_names.append(param_name)
+            elif param.get('in') == 'query':
+                query_params.append(param)
+        
+        # Check for request body
+        if op.request_body:
+            params.append("Object requestBody")
+        
+        # Determine return type
+        return_type = "Object"
+        if '200' in op.responses:
+            response_schema = op.responses['200'].get('content', {}).get('application/json', {}).get('schema', {})
+            if response_schema:
+                return_type = response_schema.get('$ref', 'Object').split('/')[-1] if '$ref' in response_schema else 'Object'
+        
+        # Find matching internal operation
+        internal_path = self._find_matching_internal_path(op, internal_index)
+        
+        uri_calls = [
+            ".scheme(internalApiBaseUri.getScheme())",
+            ".host(internalApiBaseUri.getHost())",
+            ".port(internalApiBaseUri.getPort())",
+            ".path(internalApiBaseUri.getPath())",
+            f'.path("{internal_path}")',
+        ]
+        if query_params:
+            uri_calls.append(".queryParams(qp)")
+        uri_calls.append(f".build({', '.join(path_param_names)})")
+        
+        if query_params:
+            # Plain map filled per call; optional params are skipped when null
+            query_lines = "".join(
+                "                "
+                + ("" if p.get('required') else f"if ({p['name']} != null) ")
+                + f"qp.add(\"{p['name']}\", String.valueOf({p['name']}));\n"
+                for p in query_params
+            )
+            uri = _SERVICE_URI_QUERY.format(
+                query_lines=query_lines,
+                calls="\n".join(f"                    {call}" for call in uri_calls),
+            )
+        else:
+            uri = _SERVICE_URI.format(calls="\n".join(f"                {call}" for call in uri_calls))
+        
+        return {
+            'return_type': return_type,
+            'operation_id': op.operation_id,
+            'params': ", ".join(params),
+            'http_method': op.method.upper(),
+            'uri': uri,
+            'body': "            .bodyValue(requestBody)\n" if op.request_body else "",
+        }
+    
+    @staticmethod
+    def _index_internal_paths(internal_ops: Iterator[Operation]) -> Tuple[Dict, Dict]:
+        """Index internal operations by operationId and by last path segment
+        
+        Each index maps to (position, path) of the first operation with that key,
+        so lookups can still prefer whichever candidate appears first in the spec.
+        """
+        by_operation_id = {}
+        by_last_segment = {}
+        for position, internal_op in enumerate(internal_ops):
+            entry = (position, internal_op.path)
+            by_operation_id.setdefault(internal_op.operation_id, entry)
+            by_last_segment.setdefault(internal_op.path.rsplit('/', 1)[-1], entry)
+        return by_operation_id, by_last_segment
+    
+    def _find_matching_internal_path(self, external_op: Operation, internal_index: Tuple[Dict, Dict]) -> str:
         """Find matching internal API path"""
         # Simple matching by operation ID or path similarity
-        for internal_op in internal_ops:
-            if internal_op['operationId'] == external_op['operationId']:
-                return internal_op['path']
-            if internal_op['path'].split('/')[-1] == external_op['path'].split('/')[-1]:
-                return internal_op['path']
+        by_operation_id, by_last_segment = internal_index
+        candidates = [
+            entry for entry in (
+                by_operation_id.get(external_op.operation_id),
+                by_last_segment.get(external_op.path.rsplit('/', 1)[-1]),
+            )
+            if entry is not None
+        ]
+        if candidates:
+            return min(candidates)[1]
         
         # Default to same path
-        return external_op['path']
+        return external_op.path
+    
+    def _render_application_properties(self) -> str:
+        """Render application.properties, through Jinja2 when it is installed"""
+        if jinja2 is None:
+            return _APPLICATION_PROPERTIES_J2.replace("{{ internal_base_url }}", self.internal_base_url)
+        env = _jinja_env(os.path.join(self.output_abs, ".jinja_cache"))
+        return env.get_template("application.properties.j2").render(internal_base_url=self.internal_base_url)
     
     def _generate_config_classes(self):
         """Generate Spring configuration classes"""
-        config_dir = os.path.join(self.generated_dir, "src/main/java/com/generated/config")
-        os.makedirs(config_dir, exist_ok=True)
+        app_properties = self._render_application_properties()
         
-        # WebClient configuration
-        webclient_config = """package com.generated.config;
-
-import org.springframework.context.annotation.Bean;
-import org.springframework.context.annotation.Configuration;
-import org.springframework.web.reactive.function.client.WebClient;
-
-@Configuration
-public class WebClientConfig {
-    
-    @Bean
-    public WebClient.Builder webClientBuilder() {
-        return WebClient.builder();
-    }
-}
-"""
-        
-        with open(os.path.join(config_dir, "WebClientConfig.java"), 'w') as f:
-            f.write(webclient_config)
-        
-        # Application main class
-        app_dir = os.path.join(self.generated_dir, "src/main/java/com/generated")
-        app_class = """package com.generated;
-
-import org.springframework.boot.SpringApplication;
-import org.springframework.boot.autoconfigure.SpringBootApplication;
-
-@SpringBootApplication
-public class Application {
-    
-    public static void main(String[] args) {
-        SpringApplication.run(Application.class, args);
-    }
-}
-"""
-        
-        with open(os.path.join(app_dir, "Application.java"), 'w') as f:
-            f.write(app_class)
-        
-        # application.properties
-        resources_dir = os.path.join(self.generated_dir, "src/main/resources")
-        os.makedirs(resources_dir, exist_ok=True)
-        
-        internal_base_url = "http://localhost:8081"
-        if self.internal_spec.get('servers'):
-            internal_base_url = self.internal_spec['servers'][0].get('url', internal_base_url)
-        
-        app_properties = f"""server.port=8080
-internal.api.base-url={internal_base_url}
-logging.level.com.generated=DEBUG
-"""
-        
-        with open(os.path.join(resources_dir, "application.properties"), 'w') as f:
-            f.write(app_properties)
+        _write_all([
+            # WebClient configuration
+            (self.config_dir / "WebClientConfig.java", _WEBCLIENT_CONFIG_JAVA),
+            # Application main class
+            (self.app_dir / "Application.java", _APPLICATION_JAVA),
+            # application.properties
+            (self.resources_dir / "application.properties", app_properties.encode("utf-8")),
+        ])
         
         print("  ✓ Generated configuration classes")
     
     def _fix_generated_code(self):
-        """Fix common issues in generated code"""
-        api_dir = os.path.join(self.generated_dir, "src/main/java/com/generated/api")
+        """Fix common issues in generated code
         
-        if not os.path.exists(api_dir):
+        Only the flat com.generated.api package is scanned, never the whole
+        generated tree; new fixups belong in the templates, not in this pass.
+        """
+        api_dir = self.app_dir / "api"
+        
+        try:
+            entries = os.scandir(api_dir)
+        except FileNotFoundError:
             print("  ! Warning: API directory not found")
             return
         
-        # Find and update API controller files
-        for root, dirs, files in os.walk(api_dir):
-            for file in files:
-                if file.endswith("Api.java") and not file.endswith("Controller.java"):
-                    file_path = os.path.join(root, file)
-                    self._update_controller_file(file_path)
+        # Find API controller files, then update them concurrently (each file is independent)
+        with entries:
+            controller_files = [
+                entry.path for entry in entries
+                if entry.name.endswith("Api.java") and entry.is_file()
+            ]
+        if controller_files:
+            with ThreadPoolExecutor(max_workers=min(8, len(controller_files))) as executor:
+                list(executor.map(self._update_controller_file, controller_files))
         
         print("  ✓ Fixed controller files")
     
+    def _verify_generated_code(self):
+        """Report missing top-level project files using a single directory scan"""
+        with os.scandir(self.generated_dir) as entries:
+            existing = {entry.name for entry in entries}
+        
+        for required in ("pom.xml", "src"):
+            if required not in existing:
+                print(f"  ! Warning: {required} not found in {self.generated_dir}")
+    
     def _update_controller_file(self, file_path: str):
         """Update controller file to inject and use service"""
+        # Probe the mapped bytes first: a wired controller without stubs needs no decode or rewrite
+        with open(file_path, 'rb') as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm.find(b'@Autowired') != -1 and mm.find(b'HttpStatus.NOT_IMPLEMENTED') == -1:
+                        return
+            except ValueError:  # empty file, nothing to fix
+                return
+        
         with open(file_path, 'r') as f:
-            content = f.read()
+            original = content = f.read()
         
         # Extract class name
-        class_match = re.search(r'public class (\w+)', content)
+        class_match = _RE_CLASS.search(content)
         if not class_match:
             return
         
@@ -499,31 +757,28 @@ logging.level.com.generated=DEBUG
 """
             
             # Insert after class declaration
-            content = re.sub(
-                r'(public class \w+ \{)',
-                r'\1' + service_injection,
-                content
-            )
+            content = _RE_CLASS_DECL.sub(r'\1' + service_injection, content)
         
-        # Update method bodies to call service
+        # Update method bodies to call service, attributing each stub to the
+        # last method signature seen in a single forward pass
         # This is a simplified approach - you may need to customize based on your needs
-        content = re.sub(
-            r'return new ResponseEntity<>\(HttpStatus\.NOT_IMPLEMENTED\);',
-            lambda m: 'return service.' + self._extract_method_name(content, m.start()) + '();',
-            content
-        )
-        
-        with open(file_path, 'w') as f:
-            f.write(content)
-    
-    def _extract_method_name(self, content: str, position: int) -> str:
-        """Extract method name from content at position"""
-        # Look backwards to find method name
-        before = content[:position]
-        method_match = re.findall(r'public \w+<?\w*>? (\w+)\(', before)
-        if method_match:
-            return method_match[-1]
-        return "unknownMethod"
+        parts = []
+        last_end = 0
+        method_name = "unknownMethod"
+        for match in _RE_METHOD_OR_STUB.finditer(content):
+            if match.group(1) is not None:
+                method_name = match.group(1)
+            else:
+                parts.append(content[last_end:match.start()])
+                parts.append(f'return service.{method_name}();')
+                last_end = match.end()
+        if parts:
+            parts.append(content[last_end:])
+            content = ''.join(parts)
+        
+        if content != original:
+            with open(file_path, 'w') as f:
+                f.write(content)
 
 
 if __name__ == "__main__":
@@ -533,13 +788,23 @@ if __name__ == "__main__":
     parser.add_argument('--external', required=True, help='External OAS file')
     parser.add_argument('--internal', required=True, help='Internal OAS file')
     parser.add_argument('--output', default='./output', help='Output directory')
+    parser.add_argument('--reuse-container', action='store_true',
+                        help='Keep the OpenAPI Generator container running between runs')
     
     args = parser.parse_args()
     
+    # Reject missing, empty or non-OAS files before any YAML parsing happens
+    for spec_path in (args.external, args.internal):
+        error = _validate_spec_file(spec_path)
+        if error:
+            print(f"✗ Error: {error}")
+            sys.exit(1)
+    
     generator = APIBridgeGenerator(
         external_oas_path=args.external,
         internal_oas_path=args.internal,
-        output_dir=args.output
+        output_dir=args.output,
+        reuse_container=args.reuse_container
     )
     
     try:
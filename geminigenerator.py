@@ -1,15 +1,38 @@
 
 import os
 import json
-from typing import TypedDict, List, Dict, Any
+import operator
+from string import Template
+from typing import TypedDict, List, Dict, Any, Annotated, Union
 from pydantic import BaseModel, Field
+import httpx
+import litellm
 from litellm import completion
 from langgraph.graph import StateGraph, START, END
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # --- 1. Configuration ---
 # Update this to your specific LiteLLM endpoint/model name
 MODEL_NAME = "anthropic/claude-3-5-sonnet-20240620" 
 
+# One pooled client for every node's LLM call, so the TLS connection opened by
+# the planner is kept alive and reused by the layer nodes
+litellm.client_session = httpx.Client(
+    http2=HTTP2_AVAILABLE,
+    timeout=httpx.Timeout(600.0, connect=10.0),
+    limits=httpx.Limits(max_keepalive_connections=16)
+)
+
 # --- 2. Schema Definitions ---
 
 class GeneratedFile(BaseModel):
@@ -25,11 +48,13 @@ class GenerationPlan(BaseModel):
     controllers: List[str] = Field(description="Names of Controller classes")
 
 class AgentState(TypedDict):
-    external_oas: str
-    internal_oas: str
+    # Specs may be given as parsed dicts or as raw YAML/JSON text
+    external_oas: Union[str, Dict[str, Any]]
+    internal_oas: Union[str, Dict[str, Any]]
     mapping_instructions: str
     plan: GenerationPlan
-    files: List[GeneratedFile]
+    # Appended to by every layer node; the reducer merges parallel branches
+    files: Annotated[List[GeneratedFile], operator.add]
     current_layer: str
 
 # --- 3. System Prompts ---
@@ -51,6 +76,96 @@ Key technical requirements:
 7. Provide a complete pom.xml with all necessary dependencies.
 """
 
+# The CONFIG layer is boilerplate that only depends on the base package, so it
+# is rendered from these templates instead of asking the LLM for it.
+
+POM_TEMPLATE = Template("""<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0"
+         xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+         xsi:schemaLocation="http://maven.apache.org/POM/4.0.0 https://maven.apache.org/xsd/maven-4.0.0.xsd">
+    <modelVersion>4.0.0</modelVersion>
+
+    <parent>
+        <groupId>org.springframework.boot</groupId>
+        <artifactId>spring-boot-starter-parent</artifactId>
+        <version>3.4.1</version>
+        <relativePath/>
+    </parent>
+
+    <groupId>$package</groupId>
+    <artifactId>generated-spring-app</artifactId>
+    <version>1.0.0</version>
+
+    <properties>
+        <java.version>21</java.version>
+    </properties>
+
+    <dependencies>
+        <dependency>
+            <groupId>org.springframework.boot</groupId>
+            <artifactId>spring-boot-starter-web</artifactId>
+        </dependency>
+        <dependency>
+            <groupId>org.springframework.boot</groupId>
+            <artifactId>spring-boot-starter-validation</artifactId>
+        </dependency>
+        <dependency>
+            <groupId>org.projectlombok</groupId>
+            <artifactId>lombok</artifactId>
+            <optional>true</optional>
+        </dependency>
+        <dependency>
+            <groupId>org.springframework.boot</groupId>
+            <artifactId>spring-boot-starter-test</artifactId>
+            <scope>test</scope>
+        </dependency>
+    </dependencies>
+
+    <build>
+        <plugins>
+            <plugin>
+                <groupId>org.springframework.boot</groupId>
+                <artifactId>spring-boot-maven-plugin</artifactId>
+                <configuration>
+                    <excludes>
+                        <exclude>
+                            <groupId>org.projectlombok</groupId>
+                            <artifactId>lombok</artifactId>
+                        </exclude>
+                    </excludes>
+                </configuration>
+            </plugin>
+        </plugins>
+    </build>
+</project>
+""")
+
+MAIN_TEMPLATE = Template("""package $package;
+
+import org.springframework.boot.SpringApplication;
+import org.springframework.boot.autoconfigure.SpringBootApplication;
+
+@SpringBootApplication
+public class MainApplication {
+
+    public static void main(String[] args) {
+        SpringApplication.run(MainApplication.class, args);
+    }
+}
+""")
+
+APPLICATION_YML = """server:
+  port: 8080
+
+spring:
+  application:
+    name: generated-spring-app
+
+internal:
+  api:
+    base-url: http://localhost:8081
+"""
+
 # --- 4. Node Implementations ---
 
 def call_llm(messages: List[Dict], response_schema: Any = None):
@@ -64,16 +179,24 @@ def call_llm(messages: List[Dict], response_schema: Any = None):
     )
     content = response.choices[0].message.content
     if response_schema:
-        return json.loads(content)
+        return orjson.loads(content) if orjson is not None else json.loads(content)
     return content
 
+def spec_text(spec: Union[str, Dict[str, Any]]) -> str:
+    """Prompt text for a spec: raw text as-is, dicts as compact JSON."""
+    if isinstance(spec, str):
+        return spec
+    if orjson is not None:
+        return orjson.dumps(spec).decode()
+    return json.dumps(spec, separators=(",", ":"))
+
 def planner_node(state: AgentState):
     """Analyzes requirements and creates a construction plan."""
     print("--- STEP: PLANNING ---")
     prompt = f"""
     Analyze the following specs and create a Generation Plan.
-    External OAS: {state['external_oas']}
-    Internal OAS: {state['internal_oas']}
+    External OAS: {spec_text(state['external_oas'])}
+    Internal OAS: {spec_text(state['internal_oas'])}
     Mapping: {state['mapping_instructions']}
     
     The plan must identify all DTOs (Request/Response), the Service logic required for mapping, 
@@ -106,9 +229,10 @@ def layer_generator_node(state: AgentState):
     
     REQUIREMENTS for {layer}:
     - If MODELS: Generate Records/Classes for both External and Internal APIs.
-    - If SERVICES: Implement RestClient logic calling Internal endpoints.
+    - If SERVICES: Implement RestClient logic calling Internal endpoints, reading the
+      base URL from the 'internal.api.base-url' property.
     - If CONTROLLERS: Expose External endpoints and call Services.
-    - If CONFIG: Generate pom.xml, application.yml, and the Main Application class.
+    - Do not generate pom.xml, application.yml or the Main Application class.
     
     Return a JSON object with a 'files' key containing a list of {path, content, language}.
     """
@@ -121,7 +245,24 @@ def layer_generator_node(state: AgentState):
     new_files_data = response_data.get('files', [])
     new_files = [GeneratedFile(**f) for f in new_files_data]
     
-    return {"files": state['files'] + new_files}
+    return {"files": new_files}
+
+def template_config_node(state: AgentState):
+    """Renders pom.xml, application.yml and the main class without the LLM."""
+    print("--- STEP: GENERATING CONFIG (template) ---")
+    package = state['plan'].package_name
+    
+    new_files = [
+        GeneratedFile(path="pom.xml", content=POM_TEMPLATE.substitute(package=package), language="xml"),
+        GeneratedFile(
+            path=f"src/main/java/{package.replace('.', '/')}/MainApplication.java",
+            content=MAIN_TEMPLATE.substitute(package=package),
+            language="java"
+        ),
+        GeneratedFile(path="src/main/resources/application.yml", content=APPLICATION_YML, language="yaml")
+    ]
+    
+    return {"files": new_files}
 
 # --- 5. Graph Construction ---
 
@@ -136,13 +277,16 @@ def create_spring_gen_graph():
     workflow.add_node("generate_models", set_layer("MODELS"))
     workflow.add_node("generate_services", set_layer("SERVICES"))
     workflow.add_node("generate_controllers", set_layer("CONTROLLERS"))
-    workflow.add_node("generate_config", set_layer("CONFIG"))
+    workflow.add_node("generate_config", template_config_node)
 
+    # Config (pom.xml, application.yml, main class) only needs the plan, so it
+    # runs alongside the models -> services -> controllers chain
     workflow.add_edge(START, "planner")
     workflow.add_edge("planner", "generate_models")
+    workflow.add_edge("planner", "generate_config")
     workflow.add_edge("generate_models", "generate_services")
     workflow.add_edge("generate_services", "generate_controllers")
-    workflow.add_edge("generate_controllers", "generate_config")
+    workflow.add_edge("generate_controllers", END)
     workflow.add_edge("generate_config", END)
 
     return workflow.compile()
@@ -154,37 +298,60 @@ def save_project(files: List[GeneratedFile], output_dir: str = "generated_spring
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         
+    written = 0
     for file in files:
         full_path = os.path.join(output_dir, file.path)
+        new = file.content.encode()
+        # Leave byte-identical files untouched so IDE watchers and incremental
+        # builds do not see a change; the size check avoids most reads
+        try:
+            if os.path.getsize(full_path) == len(new):
+                with open(full_path, "rb") as f:
+                    if f.read() == new:
+                        continue
+        except OSError:
+            pass
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        with open(full_path, "w") as f:
-            f.write(file.content)
-    print(f"\nSUCCESS: Project saved to {output_dir}")
+        with open(full_path, "wb") as f:
+            f.write(new)
+        written += 1
+    print(f"\nSUCCESS: Project saved to {output_dir} ({written} of {len(files)} files written)")
 
 # --- 7. Execution ---
 
 if __name__ == "__main__":
     inputs = {
-        "external_oas": """
-            paths:
-              /v1/orders:
-                get:
-                  responses:
-                    '200':
-                      content:
-                        application/json:
-                          schema:
-                            type: array
-                            items: { $ref: '#/components/schemas/Order' }
-        """,
-        "internal_oas": """
-            paths:
-              /api/internal/legacy-orders:
-                get:
-                  responses:
-                    '200':
-                      description: Returns legacy order objects
-        """,
+        "external_oas": {
+            "paths": {
+                "/v1/orders": {
+                    "get": {
+                        "responses": {
+                            "200": {
+                                "content": {
+                                    "application/json": {
+                                        "schema": {
+                                            "type": "array",
+                                            "items": {"$ref": "#/components/schemas/Order"}
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        "internal_oas": {
+            "paths": {
+                "/api/internal/legacy-orders": {
+                    "get": {
+                        "responses": {
+                            "200": {"description": "Returns legacy order objects"}
+                        }
+                    }
+                }
+            }
+        },
         "mapping_instructions": "Map /v1/orders to /api/internal/legacy-orders. Map legacy field 'order_id' to 'id'.",
         "files": [],
         "plan": None,
@@ -2,13 +2,101 @@
 
 import yaml
 import os
+import re
+import hashlib
+import pickle
+import threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from litellm import completion
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 import json
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Whole version (/v1, /v2, /v10, ...) or /api segments, ignored when comparing paths
+_PREFIX_RE = re.compile(r'/(?:v\d+|api)(?=/|$)')
+
+_HTTP_METHODS = frozenset(('get', 'post', 'put', 'delete', 'patch'))
+
+# "// File: Name.java" marker line and the body up to the next marker
+_FILE_RE = re.compile(r'// File: ((?:(?!// File: )[^\n])*)\n?(.*?)(?=// File: |\Z)', re.S)
+
+_PACKAGE_RE = re.compile(r'^[ \t]*package\s+([\w.]+)', re.M)
+
+# Body of the first ```xml block, else of the first fenced block of any
+# language (an unterminated fence runs to the end of the text)
+_XML_FENCE_RE = re.compile(r'```xml(.*?)(?:```|\Z)', re.S)
+_CODE_FENCE_RE = re.compile(r'```(?:[^\n`]*\n)?(.*?)(?:```|\Z)', re.S)
+
+# Bump when the parsed spec layout changes so stale pickles are ignored
+_SPEC_CACHE_VERSION = "v1"
+
+# Per-user cache; pickles are only read from here once it is private to us
+_SPEC_CACHE_DIR = Path(os.path.expanduser("~/.cache/oasgen"))
+
+def _private_cache_dir() -> Optional[Path]:
+    """
+    The spec cache dir, created 0700, or None when it is not owned by the
+    current user or is accessible to others (unpickling it would be unsafe)
+    """
+    try:
+        _SPEC_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        stat = _SPEC_CACHE_DIR.lstat()
+    except OSError:
+        return None
+    if not _SPEC_CACHE_DIR.is_dir() or _SPEC_CACHE_DIR.is_symlink():
+        return None
+    if hasattr(os, 'getuid') and (stat.st_uid != os.getuid() or stat.st_mode & 0o077):
+        return None
+    return _SPEC_CACHE_DIR
+
+def _load_spec_cached(path: str) -> Dict:
+    """
+    Parse an OAS file, reusing a pickled copy from the per-user cache dir
+    when the file's size and mtime are unchanged since it was last parsed
+    """
+    cache_dir = _private_cache_dir()
+    if cache_dir is None:
+        return yaml.load(Path(path).read_text(encoding='utf-8'), Loader=SafeLoader)
+    
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{_SPEC_CACHE_VERSION}"
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    cache_path = cache_dir / f"spec_{digest}.pkl"
+    
+    if cache_path.exists():
+        try:
+            return pickle.loads(cache_path.read_bytes())
+        except Exception:
+            pass  # Corrupt or unreadable cache entry, parse again
+    
+    spec = yaml.load(Path(path).read_text(encoding='utf-8'), Loader=SafeLoader)
+    try:
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(pickle.dumps(spec, protocol=5))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return spec
+
+
 class SpringBootGatewayGenerator:
-    def __init__(self, external_oas_file: str, internal_oas_file: str, internal_base_url: str):
+    # Output caps sent with every call; the fast model only writes a single
+    # file (pom.xml, one test class, the exception classes)
+    FAST_MAX_TOKENS = 4096
+    SMART_MAX_TOKENS = 8192
+    
+    def __init__(self, external_oas_file: str, internal_oas_file: str, internal_base_url: str,
+                 use_llm_for_boilerplate: bool = False):
         """
         Initialize the generator with external and internal OAS files
         
@@ -16,28 +104,46 @@ class SpringBootGatewayGenerator:
             external_oas_file: Path to external API specification
             internal_oas_file: Path to internal API specification
             internal_base_url: Base URL for internal API (e.g., http://internal-service:8080)
+            use_llm_for_boilerplate: Ask the LLM for pom.xml and the exception
+                handler instead of rendering them from the built-in templates
         """
-        with open(external_oas_file, 'r') as f:
-            self.external_spec = yaml.safe_load(f)
-            self.external_yaml = f.read()
-            
-        with open(internal_oas_file, 'r') as f:
-            self.internal_spec = yaml.safe_load(f)
-            self.internal_yaml = f.read()
+        self.external_spec = _load_spec_cached(external_oas_file)
+        self.internal_spec = _load_spec_cached(internal_oas_file)
             
         self.internal_base_url = internal_base_url
+        self.use_llm_for_boilerplate = use_llm_for_boilerplate
+        # Boilerplate (pom.xml, tests, exceptions) goes to the faster model;
+        # models, controllers and services need the stronger one
+        self._fast_model = "claude-3-5-haiku-20241022"
+        self._smart_model = "claude-3-5-sonnet-20241022"
         self.project_name = self.external_spec['info']['title'].replace(' ', '').replace('-', '')
-        self.base_package = f"com.gateway.{self.project_name.lower()}"
+        self.project_name_lower = self.project_name.lower()
+        self.base_package = f"com.gateway.{self.project_name_lower}"
+        self.package_path = self.base_package.replace('.', '/')
+        self._mappings = None
+        self._known_dirs = set()
+        # Generated file -> rank of the step that wrote it (see _write_generated)
+        self._file_ranks = {}
+        self._write_lock = threading.Lock()
+        self._index_internal_paths()
         
     def map_endpoints(self) -> List[Dict]:
         """
         Map external endpoints to internal endpoints based on path and operation
+        
+        The specs do not change after __init__, so the result is computed once.
         """
+        if self._mappings is None:
+            self._mappings = self._compute_mappings()
+        return self._mappings
+    
+    def _compute_mappings(self) -> List[Dict]:
+        """Match every external operation against the internal spec"""
         mappings = []
         
-        for ext_path, ext_methods in self.external_spec.get('paths', {}).items():
+        for ext_path, ext_methods in (self.external_spec.get('paths') or {}).items():
             for ext_method, ext_details in ext_methods.items():
-                if ext_method not in ['get', 'post', 'put', 'delete', 'patch']:
+                if ext_method not in _HTTP_METHODS:
                     continue
                 
                 # Try to find matching internal endpoint
@@ -56,51 +162,65 @@ class SpringBootGatewayGenerator:
         
         return mappings
     
+    def _index_internal_paths(self):
+        """
+        Build lookup tables over the internal spec so matching an external
+        endpoint is a few dict lookups instead of rescanning every path
+        """
+        self._int_paths = self.internal_spec.get('paths') or {}
+        
+        # cleaned path -> [(path, methods)] in spec order
+        self._int_clean_index = {}
+        for int_path, int_methods in self._int_paths.items():
+            self._int_clean_index.setdefault(self._clean_path(int_path), []).append((int_path, int_methods))
+        
+        # lower-cased operationId -> first (path, method, details) declaring it
+        self._int_opid_index = {}
+        for int_path, int_methods in self._int_paths.items():
+            for int_method, int_details in int_methods.items():
+                if int_method not in _HTTP_METHODS:
+                    continue
+                int_op_id = int_details.get('operationId', '')
+                if int_op_id:
+                    self._int_opid_index.setdefault(int_op_id.lower(), (int_path, int_method, int_details))
+    
     def _find_internal_endpoint(self, ext_path: str, ext_method: str, ext_details: Dict) -> Optional[Dict]:
         """
         Find matching internal endpoint for an external endpoint
         """
         # First try: exact path match
-        if ext_path in self.internal_spec.get('paths', {}):
-            if ext_method in self.internal_spec['paths'][ext_path]:
+        if ext_path in self._int_paths:
+            if ext_method in self._int_paths[ext_path]:
                 return {
                     'path': ext_path,
                     'method': ext_method,
-                    'details': self.internal_spec['paths'][ext_path][ext_method]
+                    'details': self._int_paths[ext_path][ext_method]
                 }
         
         # Second try: similar path (remove version prefixes, etc.)
-        for int_path, int_methods in self.internal_spec.get('paths', {}).items():
-            if self._paths_similar(ext_path, int_path):
-                if ext_method in int_methods:
-                    return {
-                        'path': int_path,
-                        'method': ext_method,
-                        'details': int_methods[ext_method]
-                    }
+        for int_path, int_methods in self._int_clean_index.get(self._clean_path(ext_path), []):
+            if ext_method in int_methods:
+                return {
+                    'path': int_path,
+                    'method': ext_method,
+                    'details': int_methods[ext_method]
+                }
         
         # Third try: use operationId or tags matching
         ext_op_id = ext_details.get('operationId', '')
-        for int_path, int_methods in self.internal_spec.get('paths', {}).items():
-            for int_method, int_details in int_methods.items():
-                if int_method not in ['get', 'post', 'put', 'delete', 'patch']:
-                    continue
-                int_op_id = int_details.get('operationId', '')
-                if ext_op_id and int_op_id and ext_op_id.lower() == int_op_id.lower():
-                    return {
-                        'path': int_path,
-                        'method': int_method,
-                        'details': int_details
-                    }
+        if ext_op_id and ext_op_id.lower() in self._int_opid_index:
+            int_path, int_method, int_details = self._int_opid_index[ext_op_id.lower()]
+            return {
+                'path': int_path,
+                'method': int_method,
+                'details': int_details
+            }
         
         return None
     
-    def _paths_similar(self, path1: str, path2: str) -> bool:
-        """Check if two paths are similar (ignoring version prefixes)"""
-        # Remove common prefixes like /v1, /api, etc.
-        clean1 = path1.replace('/v1', '').replace('/v2', '').replace('/api', '')
-        clean2 = path2.replace('/v1', '').replace('/v2', '').replace('/api', '')
-        return clean1 == clean2
+    def _clean_path(self, path: str) -> str:
+        """Strip common prefixes like /v1, /api, etc."""
+        return _PREFIX_RE.sub('', path)
     
     def generate_project(self, output_dir: str = "generated-gateway"):
         """Generate complete Spring Boot 3 project"""
@@ -111,17 +231,46 @@ class SpringBootGatewayGenerator:
         # Create directory structure
         self._create_directory_structure(output_dir)
         
-        # Generate files
-        self._generate_pom_xml(output_dir)
-        self._generate_application_properties(output_dir)
-        self._generate_main_class(output_dir)
-        self._generate_models(output_dir, mappings)
-        self._generate_controllers(output_dir, mappings)
-        self._generate_services(output_dir, mappings)
-        self._generate_client_config(output_dir)
-        self._generate_exception_handler(output_dir)
-        self._generate_tests(output_dir, mappings)
-        self._generate_readme(output_dir)
+        # pom.xml and the exception handler are boilerplate; unless asked
+        # otherwise they are rendered from templates instead of the LLM
+        if self.use_llm_for_boilerplate:
+            pom_source, exceptions_source = self._generate_pom_xml, self._generate_exception_handler
+        else:
+            pom_source, exceptions_source = self._render_pom_xml, self._render_exception_handler
+        
+        # The LLM calls do not depend on each other, so they are all in flight
+        # at once, and each response is written file by file while it streams
+        # in. Every step has a rank in the original order; when two steps emit
+        # the same file the later one still wins (e.g. the static
+        # WebClientConfig overrides the one generated with the services).
+        # The services call shares its prompt prefix with the controllers
+        # call, and a cache entry is only readable once the response writing
+        # it has begun, so it waits for the first controllers chunk.
+        self._file_ranks = {}
+        shared = self._shared_context(mappings)
+        controllers_started = threading.Event()
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            pom = executor.submit(pom_source)
+            models = executor.submit(self._stream_java_step, output_dir, 0, self._generate_models, mappings)
+            controllers = executor.submit(self._stream_java_step, output_dir, 1, self._generate_controllers, shared,
+                                          started=controllers_started)
+            services = executor.submit(self._stream_java_step, output_dir, 2, self._generate_services, shared,
+                                       wait_for=controllers_started)
+            exceptions = executor.submit(self._stream_java_step, output_dir, 4, exceptions_source)
+            tests = executor.submit(self._stream_java_step, output_dir, 5, self._generate_tests, mappings,
+                                    is_test=True)
+            
+            # Generate files
+            self._write_pom_xml(output_dir, pom.result())
+            self._generate_application_properties(output_dir)
+            self._generate_main_class(output_dir)
+            self._report_step(models.result(), "model classes")
+            self._report_step(controllers.result(), "controller classes")
+            self._report_step(services.result(), "service classes and WebClient config")
+            self._generate_client_config(output_dir)
+            self._report_step(exceptions.result(), "exception handler classes")
+            self._report_step(tests.result(), "test classes")
+        self._generate_readme(output_dir, mappings)
         self._generate_dockerfile(output_dir)
         
         print(f"\n✅ Project generated successfully in: {output_dir}")
@@ -137,31 +286,32 @@ class SpringBootGatewayGenerator:
         src_test = base_path / "src" / "test"
         
         # Java packages
-        package_path = self.base_package.replace('.', '/')
-        
         dirs = [
-            src_main / "java" / package_path / "controller",
-            src_main / "java" / package_path / "service",
-            src_main / "java" / package_path / "model" / "request",
-            src_main / "java" / package_path / "model" / "response",
-            src_main / "java" / package_path / "config",
-            src_main / "java" / package_path / "exception",
-            src_main / "java" / package_path / "client",
+            src_main / "java" / self.package_path / "controller",
+            src_main / "java" / self.package_path / "service",
+            src_main / "java" / self.package_path / "model" / "request",
+            src_main / "java" / self.package_path / "model" / "response",
+            src_main / "java" / self.package_path / "config",
+            src_main / "java" / self.package_path / "exception",
+            src_main / "java" / self.package_path / "client",
             src_main / "resources",
-            src_test / "java" / package_path / "controller",
-            src_test / "java" / package_path / "service",
+            src_test / "java" / self.package_path / "controller",
+            src_test / "java" / self.package_path / "service",
         ]
         
         for dir_path in dirs:
             dir_path.mkdir(parents=True, exist_ok=True)
+        
+        # Remember what exists so saving generated files skips redundant mkdirs
+        self._known_dirs.update(dirs)
     
-    def _generate_pom_xml(self, output_dir: str):
-        """Generate pom.xml using LLM"""
+    def _generate_pom_xml(self) -> str:
+        """Generate pom.xml content using LLM (use_llm_for_boilerplate)"""
         prompt = f"""Generate a complete pom.xml for a Spring Boot 3.2.x project with Java 21.
 
 Project details:
 - Group ID: com.gateway
-- Artifact ID: {self.project_name.lower()}-gateway
+- Artifact ID: {self.project_name_lower}-gateway
 - Name: {self.project_name} Gateway
 - Description: Gateway service exposing external APIs and calling internal services
 
@@ -184,22 +334,158 @@ Include:
 Provide ONLY the pom.xml content, no explanations."""
 
         response = completion(
-            model="claude-3-5-sonnet-20241022",
+            model=self._fast_model,
+            max_tokens=self.FAST_MAX_TOKENS,
             messages=[{"role": "user", "content": prompt}]
         )
         
-        content = self._extract_code(response.choices[0].message.content)
-        
-        with open(f"{output_dir}/pom.xml", 'w') as f:
-            f.write(content)
+        return self._extract_code(response.choices[0].message.content)
+    
+    def _render_pom_xml(self) -> str:
+        """Render pom.xml from the built-in template"""
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0"
+         xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+         xsi:schemaLocation="http://maven.apache.org/POM/4.0.0 https://maven.apache.org/xsd/maven-4.0.0.xsd">
+    <modelVersion>4.0.0</modelVersion>
+
+    <parent>
+        <groupId>org.springframework.boot</groupId>
+        <artifactId>spring-boot-starter-parent</artifactId>
+        <version>3.2.5</version>
+        <relativePath/>
+    </parent>
+
+    <groupId>com.gateway</groupId>
+    <artifactId>{self.project_name_lower}-gateway</artifactId>
+    <version>1.0.0</version>
+    <name>{self.project_name} Gateway</name>
+    <description>Gateway service exposing external APIs and calling internal services</description>
+
+    <properties>
+        <java.version>21</java.version>
+        <springdoc.version>2.5.0</springdoc.version>
+    </properties>
+
+    <dependencies>
+        <dependency>
+            <groupId>org.springframework.boot</groupId>
+            <artifactId>spring-boot-starter-web</artifactId>
+        </dependency>
+        <dependency>
+            <groupId>org.springframework.boot</groupId>
+            <artifactId>spring-boot-starter-webflux</artifactId>
+        </dependency>
+        <dependency>
+            <groupId>org.springframework.boot</groupId>
+            <artifactId>spring-boot-starter-validation</artifactId>
+        </dependency>
+        <dependency>
+            <groupId>org.springframework.boot</groupId>
+            <artifactId>spring-boot-starter-actuator</artifactId>
+        </dependency>
+        <dependency>
+            <groupId>io.micrometer</groupId>
+            <artifactId>micrometer-registry-prometheus</artifactId>
+        </dependency>
+        <dependency>
+            <groupId>org.springdoc</groupId>
+            <artifactId>springdoc-openapi-starter-webmvc-ui</artifactId>
+            <version>${{springdoc.version}}</version>
+        </dependency>
+        <dependency>
+            <groupId>org.projectlombok</groupId>
+            <artifactId>lombok</artifactId>
+            <optional>true</optional>
+        </dependency>
+        <dependency>
+            <groupId>org.springframework.boot</groupId>
+            <artifactId>spring-boot-starter-test</artifactId>
+            <scope>test</scope>
+        </dependency>
+    </dependencies>
+
+    <build>
+        <plugins>
+            <plugin>
+                <groupId>org.apache.maven.plugins</groupId>
+                <artifactId>maven-compiler-plugin</artifactId>
+                <configuration>
+                    <release>${{java.version}}</release>
+                    <annotationProcessorPaths>
+                        <path>
+                            <groupId>org.projectlombok</groupId>
+                            <artifactId>lombok</artifactId>
+                            <version>${{lombok.version}}</version>
+                        </path>
+                    </annotationProcessorPaths>
+                </configuration>
+            </plugin>
+            <plugin>
+                <groupId>org.springframework.boot</groupId>
+                <artifactId>spring-boot-maven-plugin</artifactId>
+                <configuration>
+                    <excludes>
+                        <exclude>
+                            <groupId>org.projectlombok</groupId>
+                            <artifactId>lombok</artifactId>
+                        </exclude>
+                    </excludes>
+                </configuration>
+            </plugin>
+        </plugins>
+    </build>
+</project>
+"""
+    
+    def _write_pom_xml(self, output_dir: str, content: str):
+        """Write the generated pom.xml"""
+        Path(output_dir, "pom.xml").write_text(content, encoding='utf-8')
         
         print("✓ Generated pom.xml")
     
+    def _stream_java_step(self, output_dir: str, rank: int, step, *args, is_test: bool = False,
+                          started: Optional[threading.Event] = None,
+                          wait_for: Optional[threading.Event] = None) -> bool:
+        """
+        Run one generation step and save its Java files as they arrive.
+        Returns False when the step was skipped (it produced None).
+        
+        The step only begins once wait_for is set; started is set when its
+        first chunk arrives (or when it ends without one).
+        """
+        if wait_for is not None:
+            wait_for.wait()
+        try:
+            content = step(*args)
+            if content is None:
+                return False
+            
+            chunks = [content] if isinstance(content, str) else content
+            if started is not None:
+                chunks = self._signal_first_chunk(chunks, started)
+            self._save_java_stream(output_dir, chunks, is_test=is_test, rank=rank)
+            return True
+        finally:
+            if started is not None:
+                started.set()
+    
+    @staticmethod
+    def _signal_first_chunk(chunks: Iterable[str], started: threading.Event) -> Iterator[str]:
+        for chunk in chunks:
+            started.set()
+            yield chunk
+    
+    def _report_step(self, done: bool, label: str):
+        """Print the summary line of a finished step"""
+        if done:
+            print(f"✓ Generated {label}")
+    
     def _generate_application_properties(self, output_dir: str):
         """Generate application.properties"""
         content = f"""# Server Configuration
 server.port=8080
-spring.application.name={self.project_name.lower()}-gateway
+spring.application.name={self.project_name_lower}-gateway
 
 # Internal Service Configuration
 internal.service.base-url={self.internal_base_url}
@@ -222,8 +508,7 @@ springdoc.swagger-ui.operationsSorter=method
 """
         
         path = Path(output_dir) / "src" / "main" / "resources" / "application.properties"
-        with open(path, 'w') as f:
-            f.write(content)
+        path.write_text(content, encoding='utf-8')
         
         print("✓ Generated application.properties")
     
@@ -245,14 +530,12 @@ public class {class_name} {{
 }}
 """
         
-        package_path = self.base_package.replace('.', '/')
-        path = Path(output_dir) / "src" / "main" / "java" / package_path / f"{class_name}.java"
-        with open(path, 'w') as f:
-            f.write(content)
+        path = Path(output_dir) / "src" / "main" / "java" / self.package_path / f"{class_name}.java"
+        path.write_text(content, encoding='utf-8')
         
         print(f"✓ Generated {class_name}.java")
     
-    def _generate_models(self, output_dir: str, mappings: List[Dict]):
+    def _generate_models(self, mappings: List[Dict]) -> Optional[Iterator[str]]:
         """Generate model classes using LLM"""
         # Extract all schemas from both specs
         external_schemas = self.external_spec.get('components', {}).get('schemas', {})
@@ -260,18 +543,18 @@ public class {class_name} {{
         
         if not external_schemas and not internal_schemas:
             print("⚠ No schemas found, skipping model generation")
-            return
+            return None
         
         prompt = f"""Generate Java 21 record classes for these OpenAPI schemas.
 
 External API Schemas (these will be exposed):
-```yaml
-{yaml.dump(external_schemas)}
+```json
+{self._compact_json(external_schemas)}
 ```
 
 Internal API Schemas (for reference):
-```yaml
-{yaml.dump(internal_schemas)}
+```json
+{self._compact_json(internal_schemas)}
 ```
 
 Requirements:
@@ -287,32 +570,87 @@ Requirements:
 Generate each class separately with a header comment showing the filename.
 Format: // File: ModelName.java"""
 
-        response = completion(
-            model="claude-3-5-sonnet-20241022",
+        stream = completion(
+            model=self._smart_model,
+            max_tokens=self.SMART_MAX_TOKENS,
             messages=[{"role": "user", "content": prompt}],
-            temperature=0.3
+            temperature=0.3,
+            stream=True
         )
         
-        content = response.choices[0].message.content
-        self._save_multiple_java_files(output_dir, content)
-        
-        print("✓ Generated model classes")
+        return self._stream_text(stream)
     
-    def _generate_controllers(self, output_dir: str, mappings: List[Dict]):
-        """Generate REST controllers using LLM"""
+    def _shared_context(self, mappings: List[Dict]) -> str:
+        """
+        Mapping context shared by the controller and service prompts.
+        It is sent first and byte-identical in both, so it forms a cacheable
+        prompt prefix.
+        
+        Rather than the raw specs, it carries the mapped operations plus only
+        the component definitions they reference, each resolved once.
+        It is built once in generate_project and passed to both steps.
+        """
         mappings_info = self._format_mappings_for_llm(mappings)
+        external_refs = self._resolve_local_refs(
+            self.external_spec, [m['external_details'] for m in mappings]
+        )
+        internal_refs = self._resolve_local_refs(
+            self.internal_spec, [m['internal_details'] for m in mappings]
+        )
         
-        prompt = f"""Generate Spring Boot 3 REST controllers for this gateway service.
+        shared = f"""Referenced External API components ($ref -> definition):
+```json
+{self._compact_json(external_refs)}
+```
 
-External API Specification:
-```yaml
-{self.external_yaml}
+Referenced Internal API components ($ref -> definition):
+```json
+{self._compact_json(internal_refs)}
 ```
 
 Endpoint Mappings (External -> Internal):
 ```json
-{json.dumps(mappings_info, indent=2)}
-```
+{self._indented_json(mappings_info)}
+```"""
+        return shared
+    
+    def _resolve_local_refs(self, spec: Dict, roots: List) -> Dict[str, Dict]:
+        """
+        Collect every local $ref ("#/components/...") reachable from roots,
+        following refs inside the referenced definitions as well
+        """
+        resolved = {}
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                ref = node.get('$ref')
+                if isinstance(ref, str) and ref.startswith('#/') and ref not in resolved:
+                    target = spec
+                    for part in ref[2:].split('/'):
+                        part = part.replace('~1', '/').replace('~0', '~')
+                        target = target.get(part) if isinstance(target, dict) else None
+                    resolved[ref] = target
+                    stack.append(target)
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        return dict(sorted(resolved.items()))
+    
+    def _cached_prefix_messages(self, shared: str, task: str) -> List[Dict]:
+        """User message whose shared part is marked for Anthropic prompt caching"""
+        return [{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": shared, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": task}
+            ]
+        }]
+    
+    def _generate_controllers(self, shared: str) -> Iterator[str]:
+        """Generate REST controllers using LLM"""
+        task = f"""Generate Spring Boot 3 REST controllers for this gateway service,
+exposing the external endpoints above.
 
 Requirements:
 - Use Spring Boot 3 and Java 21
@@ -332,32 +670,19 @@ Requirements:
 Generate each controller class separately with a header comment showing the filename.
 Format: // File: ControllerName.java"""
 
-        response = completion(
-            model="claude-3-5-sonnet-20241022",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3
+        stream = completion(
+            model=self._smart_model,
+            max_tokens=self.SMART_MAX_TOKENS,
+            messages=self._cached_prefix_messages(shared, task),
+            temperature=0.3,
+            stream=True
         )
         
-        content = response.choices[0].message.content
-        self._save_multiple_java_files(output_dir, content)
-        
-        print("✓ Generated controller classes")
+        return self._stream_text(stream)
     
-    def _generate_services(self, output_dir: str, mappings: List[Dict]):
+    def _generate_services(self, shared: str) -> Iterator[str]:
         """Generate service layer using LLM"""
-        mappings_info = self._format_mappings_for_llm(mappings)
-        
-        prompt = f"""Generate Spring Boot 3 service classes that call internal APIs.
-
-Internal API Specification:
-```yaml
-{self.internal_yaml}
-```
-
-Endpoint Mappings (External -> Internal):
-```json
-{json.dumps(mappings_info, indent=2)}
-```
+        task = f"""Generate Spring Boot 3 service classes that call the internal endpoints above.
 
 Internal Service Base URL: {self.internal_base_url}
 
@@ -383,16 +708,15 @@ Also generate a WebClient configuration class:
 - Package: {self.base_package}.config
 - Configure WebClient bean with timeouts and base URL from properties"""
 
-        response = completion(
-            model="claude-3-5-sonnet-20241022",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3
+        stream = completion(
+            model=self._smart_model,
+            max_tokens=self.SMART_MAX_TOKENS,
+            messages=self._cached_prefix_messages(shared, task),
+            temperature=0.3,
+            stream=True
         )
         
-        content = response.choices[0].message.content
-        self._save_multiple_java_files(output_dir, content)
-        
-        print("✓ Generated service classes and WebClient config")
+        return self._stream_text(stream)
     
     def _generate_client_config(self, output_dir: str):
         """Generate REST client configuration"""
@@ -439,15 +763,14 @@ public class WebClientConfig {{
 }}
 """
         
-        package_path = self.base_package.replace('.', '/')
-        path = Path(output_dir) / "src" / "main" / "java" / package_path / "config" / "WebClientConfig.java"
-        with open(path, 'w') as f:
-            f.write(content)
+        path = Path(output_dir) / "src" / "main" / "java" / self.package_path / "config" / "WebClientConfig.java"
+        # Ranked after the services step, whose WebClientConfig this replaces
+        self._write_generated(path, content, rank=3)
         
         print("✓ Generated WebClientConfig.java")
     
-    def _generate_exception_handler(self, output_dir: str):
-        """Generate global exception handler"""
+    def _generate_exception_handler(self) -> Iterator[str]:
+        """Generate global exception handler using LLM (use_llm_for_boilerplate)"""
         prompt = f"""Generate a global exception handler for a Spring Boot 3 gateway application.
 
 Requirements:
@@ -468,22 +791,143 @@ Generate:
 
 Format each file with: // File: ClassName.java"""
 
-        response = completion(
-            model="claude-3-5-sonnet-20241022",
+        stream = completion(
+            model=self._fast_model,
+            max_tokens=self.FAST_MAX_TOKENS,
             messages=[{"role": "user", "content": prompt}],
-            temperature=0.3
+            temperature=0.3,
+            stream=True
         )
         
-        content = response.choices[0].message.content
-        self._save_multiple_java_files(output_dir, content)
-        
-        print("✓ Generated exception handler classes")
+        return self._stream_text(stream)
     
-    def _generate_tests(self, output_dir: str, mappings: List[Dict]):
+    def _render_exception_handler(self) -> str:
+        """Render the exception classes and handler from the built-in template"""
+        package = f"{self.base_package}.exception"
+        return f"""// File: ErrorResponse.java
+```java
+package {package};
+
+import java.time.Instant;
+
+public record ErrorResponse(Instant timestamp, int status, String error, String message, String path) {{
+
+    public static ErrorResponse of(int status, String error, String message, String path) {{
+        return new ErrorResponse(Instant.now(), status, error, message, path);
+    }}
+}}
+```
+
+// File: ResourceNotFoundException.java
+```java
+package {package};
+
+public class ResourceNotFoundException extends RuntimeException {{
+
+    public ResourceNotFoundException(String message) {{
+        super(message);
+    }}
+}}
+```
+
+// File: InternalServiceException.java
+```java
+package {package};
+
+import org.springframework.http.HttpStatusCode;
+
+public class InternalServiceException extends RuntimeException {{
+
+    private final HttpStatusCode statusCode;
+
+    public InternalServiceException(String message, HttpStatusCode statusCode, Throwable cause) {{
+        super(message, cause);
+        this.statusCode = statusCode;
+    }}
+
+    public HttpStatusCode getStatusCode() {{
+        return statusCode;
+    }}
+}}
+```
+
+// File: GlobalExceptionHandler.java
+```java
+package {package};
+
+import jakarta.servlet.http.HttpServletRequest;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.http.HttpStatus;
+import org.springframework.http.HttpStatusCode;
+import org.springframework.http.ResponseEntity;
+import org.springframework.web.bind.MethodArgumentNotValidException;
+import org.springframework.web.bind.annotation.ExceptionHandler;
+import org.springframework.web.bind.annotation.RestControllerAdvice;
+import org.springframework.web.reactive.function.client.WebClientRequestException;
+import org.springframework.web.reactive.function.client.WebClientResponseException;
+
+import java.util.stream.Collectors;
+
+@Slf4j
+@RestControllerAdvice
+public class GlobalExceptionHandler {{
+
+    @ExceptionHandler(ResourceNotFoundException.class)
+    public ResponseEntity<ErrorResponse> handleNotFound(ResourceNotFoundException ex, HttpServletRequest request) {{
+        log.warn("Resource not found: {{}}", ex.getMessage());
+        return build(HttpStatus.NOT_FOUND, ex.getMessage(), request);
+    }}
+
+    @ExceptionHandler(MethodArgumentNotValidException.class)
+    public ResponseEntity<ErrorResponse> handleValidation(MethodArgumentNotValidException ex, HttpServletRequest request) {{
+        String message = ex.getBindingResult().getFieldErrors().stream()
+                .map(error -> error.getField() + ": " + error.getDefaultMessage())
+                .collect(Collectors.joining(", "));
+        log.warn("Validation failed: {{}}", message);
+        return build(HttpStatus.BAD_REQUEST, message, request);
+    }}
+
+    @ExceptionHandler(WebClientResponseException.class)
+    public ResponseEntity<ErrorResponse> handleInternalResponse(WebClientResponseException ex, HttpServletRequest request) {{
+        log.error("Internal service returned {{}}: {{}}", ex.getStatusCode(), ex.getResponseBodyAsString());
+        HttpStatusCode status = ex.getStatusCode().is4xxClientError() ? ex.getStatusCode() : HttpStatus.BAD_GATEWAY;
+        return build(status, "Internal service error: " + ex.getStatusText(), request);
+    }}
+
+    @ExceptionHandler(WebClientRequestException.class)
+    public ResponseEntity<ErrorResponse> handleInternalUnavailable(WebClientRequestException ex, HttpServletRequest request) {{
+        log.error("Internal service unreachable: {{}}", ex.getMessage());
+        return build(HttpStatus.SERVICE_UNAVAILABLE, "Internal service unavailable", request);
+    }}
+
+    @ExceptionHandler(InternalServiceException.class)
+    public ResponseEntity<ErrorResponse> handleInternalService(InternalServiceException ex, HttpServletRequest request) {{
+        log.error("Internal service failure: {{}}", ex.getMessage(), ex);
+        HttpStatusCode status = ex.getStatusCode() != null ? ex.getStatusCode() : HttpStatus.BAD_GATEWAY;
+        return build(status, ex.getMessage(), request);
+    }}
+
+    @ExceptionHandler(Exception.class)
+    public ResponseEntity<ErrorResponse> handleGeneric(Exception ex, HttpServletRequest request) {{
+        log.error("Unexpected error", ex);
+        return build(HttpStatus.INTERNAL_SERVER_ERROR, "An unexpected error occurred", request);
+    }}
+
+    private ResponseEntity<ErrorResponse> build(HttpStatusCode status, String message, HttpServletRequest request) {{
+        HttpStatus resolved = HttpStatus.resolve(status.value());
+        String error = resolved != null ? resolved.getReasonPhrase() : status.toString();
+        return ResponseEntity.status(status)
+                .body(ErrorResponse.of(status.value(), error, message, request.getRequestURI()));
+    }}
+}}
+```
+"""
+    
+    def _generate_tests(self, mappings: List[Dict]) -> Optional[Iterator[str]]:
         """Generate test classes"""
         if not mappings:
             print("⚠ No mappings found, skipping test generation")
-            return
+            return None
             
         # Pick first mapping as example
         example_mapping = mappings[0]
@@ -508,20 +952,18 @@ Requirements:
 Generate a sample controller test class.
 Format: // File: ControllerNameTest.java"""
 
-        response = completion(
-            model="claude-3-5-sonnet-20241022",
+        stream = completion(
+            model=self._fast_model,
+            max_tokens=self.FAST_MAX_TOKENS,
             messages=[{"role": "user", "content": prompt}],
-            temperature=0.3
+            temperature=0.3,
+            stream=True
         )
         
-        content = response.choices[0].message.content
-        self._save_multiple_java_files(output_dir, content, is_test=True)
-        
-        print("✓ Generated test classes")
+        return self._stream_text(stream)
     
-    def _generate_readme(self, output_dir: str):
+    def _generate_readme(self, output_dir: str, mappings: List[Dict]):
         """Generate README.md"""
-        mappings = self.map_endpoints()
         endpoints_table = self._format_endpoints_table(mappings)
         
         content = f"""# {self.project_name} Gateway Service
@@ -579,18 +1021,18 @@ server.port=8080
 ./mvnw spring-boot:run
 
 # Or run the JAR
-java -jar target/{self.project_name.lower()}-gateway-1.0.0.jar
+java -jar target/{self.project_name_lower}-gateway-1.0.0.jar
 ```
 
 ### Docker
 ```bash
 # Build image
-docker build -t {self.project_name.lower()}-gateway .
+docker build -t {self.project_name_lower}-gateway .
 
 # Run container
 docker run -p 8080:8080 \\
   -e INTERNAL_SERVICE_BASE_URL={self.internal_base_url} \\
-  {self.project_name.lower()}-gateway
+  {self.project_name_lower}-gateway
 ```
 
 ## API Documentation
@@ -613,7 +1055,7 @@ curl http://localhost:8080/actuator/health
 src/
 ├── main/
 │   ├── java/
-│   │   └── {self.base_package.replace('.', '/')}/
+│   │   └── {self.package_path}/
 │   │       ├── controller/     # REST controllers
 │   │       ├── service/        # Business logic & internal API calls
 │   │       ├── model/          # Request/Response DTOs
@@ -663,8 +1105,7 @@ Access actuator endpoints:
 For issues or questions, please contact [Your Contact Info]
 """
         
-        with open(f"{output_dir}/README.md", 'w') as f:
-            f.write(content)
+        Path(output_dir, "README.md").write_text(content, encoding='utf-8')
         
         print("✓ Generated README.md")
     
@@ -706,8 +1147,7 @@ HEALTHCHECK --interval=30s --timeout=3s --start-period=40s --retries=3 \\
 ENTRYPOINT ["java", "-jar", "app.jar"]
 """
         
-        with open(f"{output_dir}/Dockerfile", 'w') as f:
-            f.write(content)
+        Path(output_dir, "Dockerfile").write_text(content, encoding='utf-8')
         
         # Also generate .dockerignore
         dockerignore = """target/
@@ -718,35 +1158,125 @@ ENTRYPOINT ["java", "-jar", "app.jar"]
 .classpath
 .project
 """
-        with open(f"{output_dir}/.dockerignore", 'w') as f:
-            f.write(dockerignore)
+        Path(output_dir, ".dockerignore").write_text(dockerignore, encoding='utf-8')
         
         print("✓ Generated Dockerfile")
     
     def _format_mappings_for_llm(self, mappings: List[Dict]) -> List[Dict]:
-        """Format mappings for LLM consumption"""
+        """
+        Format mappings for LLM consumption
+        
+        Only what the code depends on is kept: parameter name/location/schema
+        and the content type plus schema of bodies. $ref schemas are reduced to
+        their name (the referenced schemas are sent separately) and inline ones
+        are kept whole apart from their descriptions.
+        """
         formatted = []
         for m in mappings:
             formatted.append({
-                'external': {
-                    'method': m['external_method'].upper(),
-                    'path': m['external_path'],
-                    'operationId': m['external_details'].get('operationId', ''),
-                    'parameters': m['external_details'].get('parameters', []),
-                    'requestBody': m['external_details'].get('requestBody', {}),
-                    'responses': m['external_details'].get('responses', {})
-                },
-                'internal': {
-                    'method': m['internal_method'].upper(),
-                    'path': m['internal_path'],
-                    'operationId': m['internal_details'].get('operationId', ''),
-                    'parameters': m['internal_details'].get('parameters', []),
-                    'requestBody': m['internal_details'].get('requestBody', {}),
-                    'responses': m['internal_details'].get('responses', {})
-                }
+                'external': self._summarize_operation(
+                    m['external_method'], m['external_path'], m['external_details']
+                ),
+                'internal': self._summarize_operation(
+                    m['internal_method'], m['internal_path'], m['internal_details']
+                )
             })
         return formatted
     
+    def _summarize_operation(self, method: str, path: str, details: Dict) -> Dict:
+        """Essentials of one operation for the mappings payload"""
+        summary = {
+            'method': method.upper(),
+            'path': path,
+            'operationId': details.get('operationId', '')
+        }
+        
+        params = []
+        for param in details.get('parameters') or []:
+            if '$ref' in param:
+                params.append({'$ref': self._ref_name(param['$ref'])})
+                continue
+            params.append({
+                'name': param.get('name'),
+                'in': param.get('in'),
+                'required': param.get('required', False),
+                'schema': self._schema_name(param.get('schema'))
+            })
+        if params:
+            summary['parameters'] = params
+        
+        body = details.get('requestBody')
+        if body:
+            summary['requestBody'] = self._summarize_content(body)
+        
+        responses = details.get('responses')
+        if responses:
+            summary['responses'] = {
+                str(code): self._summarize_content(resp) for code, resp in responses.items()
+            }
+        return summary
+    
+    def _summarize_content(self, node: Dict):
+        """Map each content type of a body/response to its schema name"""
+        if not isinstance(node, dict):
+            return None
+        if '$ref' in node:
+            return self._ref_name(node['$ref'])
+        content = node.get('content') or {}
+        return {ctype: self._schema_name(media.get('schema')) for ctype, media in content.items()
+                if isinstance(media, dict)} or None
+    
+    def _schema_name(self, schema):
+        """
+        $ref name of a schema ("Name[]" for arrays of refs, the bare type for
+        plain scalars), else the inline schema without its descriptions
+        """
+        if not isinstance(schema, dict):
+            return None
+        if '$ref' in schema:
+            return self._ref_name(schema['$ref'])
+        inline = self._inline_schema(schema)
+        if set(inline) == {'type'}:
+            return inline['type']
+        if set(inline) == {'type', 'items'} and inline['type'] == 'array' and isinstance(inline['items'], str):
+            return f"{inline['items']}[]"
+        return inline
+    
+    def _inline_schema(self, schema: Dict) -> Dict:
+        """Copy of an inline schema with descriptions dropped and nested schemas summarized"""
+        inline = {}
+        for key, value in schema.items():
+            if key == 'description':
+                continue
+            if key == 'properties' and isinstance(value, dict):
+                value = {name: self._schema_name(prop) for name, prop in value.items()}
+            elif key in ('items', 'additionalProperties', 'not') and isinstance(value, dict):
+                value = self._schema_name(value)
+            elif key in ('allOf', 'oneOf', 'anyOf') and isinstance(value, list):
+                value = [self._schema_name(sub) for sub in value]
+            inline[key] = value
+        return inline
+    
+    @staticmethod
+    def _ref_name(ref: str) -> str:
+        return ref.rsplit('/', 1)[-1]
+    
+    def _compact_json(self, data) -> str:
+        """
+        Whitespace-free JSON for prompt payloads: a YAML subset the model reads
+        just as well, much faster to produce than yaml.dump and fewer tokens.
+        YAML scalars JSON lacks (dates in examples) are sent as strings.
+        """
+        if orjson is not None:
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str)
+    
+    def _indented_json(self, data) -> str:
+        """Indented JSON for the mappings payload, via orjson when installed"""
+        if orjson is not None:
+            return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(data, indent=2, ensure_ascii=False, default=str)
+    
     def _format_endpoints_table(self, mappings: List[Dict]) -> str:
         """Format endpoint mappings as markdown table"""
         if not mappings:
@@ -763,61 +1293,93 @@ ENTRYPOINT ["java", "-jar", "app.jar"]
         return table
     
     def _extract_code(self, content: str) -> str:
-        """Extract code from markdown code blocks"""
-        if '```xml' in content:
-            start = content.find('```xml') + 6
-            end = content.find('```', start)
-            return content[start:end].strip()
-        elif '```' in content:
-            start = content.find('```') + 3
-            # Skip language identifier
-            newline = content.find('\n', start)
-            start = newline + 1 if newline != -1 else start
-            end = content.find('```', start)
-            return content[start:end].strip()
-        return content.strip()
+        """Extract code from markdown code blocks, preferring an xml block"""
+        match = _XML_FENCE_RE.search(content) or _CODE_FENCE_RE.search(content)
+        return (match.group(1) if match else content).strip()
+    
+    def _stream_text(self, stream) -> Iterator[str]:
+        """Text deltas of a streamed completion"""
+        for chunk in stream:
+            text = chunk.choices[0].delta.content
+            if text:
+                yield text
     
     def _save_multiple_java_files(self, output_dir: str, content: str, is_test: bool = False):
         """Parse and save multiple Java files from LLM output"""
-        # Split by file markers
-        files = content.split('// File: ')
+        self._save_java_stream(output_dir, [content], is_test=is_test)
+    
+    def _save_java_stream(self, output_dir: str, chunks: Iterable[str], is_test: bool = False,
+                          rank: Optional[int] = None):
+        """
+        Save the files of a "// File:" delimited response while it arrives.
+        A file is written as soon as the next marker shows that it is complete;
+        only the file still being received is kept in memory.
+        """
+        # Determine subdirectory based on package
+        if is_test:
+            base_dir = Path(output_dir) / "src" / "test" / "java"
+        else:
+            base_dir = Path(output_dir) / "src" / "main" / "java"
         
-        for file_content in files[1:]:  # Skip first empty split
-            lines = file_content.split('\n')
-            filename = lines[0].strip()
-            
-            # Extract code (skip markdown if present)
-            code_lines = lines[1:]
-            code = '\n'.join(code_lines)
-            
-            # Remove markdown code blocks if present
-            if '```java' in code:
-                code = self._extract_code(code)
-            elif '```' in code:
-                code = self._extract_code(code)
-            
-            # Determine package from content
-            package_line = [l for l in code.split('\n') if l.strip().startswith('package ')]
-            if not package_line:
-                print(f"⚠ Skipping {filename} - no package declaration found")
-                continue
-            
-            package = package_line[0].replace('package ', '').replace(';', '').strip()
-            package_path = package.replace('.', '/')
-            
-            # Determine subdirectory based on package
-            if is_test:
-                base_dir = Path(output_dir) / "src" / "test" / "java"
-            else:
-                base_dir = Path(output_dir) / "src" / "main" / "java"
-            
-            file_path = base_dir / package_path / filename
-            file_path.parent.mkdir(parents=True, exist_ok=True)
+        marker = '// File: '
+        buf = ''
+        for chunk in chunks:
+            buf += chunk
+            while True:
+                start = buf.find(marker)
+                if start == -1:
+                    # Text before the first marker is not saved; keep just
+                    # enough of it to recognise a marker split across chunks
+                    buf = buf[-(len(marker) - 1):]
+                    break
+                end = buf.find(marker, start + len(marker))
+                if end == -1:
+                    buf = buf[start:]
+                    break
+                self._save_java_file(base_dir, _FILE_RE.match(buf, start, end), rank)
+                buf = buf[end:]
+        
+        for match in _FILE_RE.finditer(buf):
+            self._save_java_file(base_dir, match, rank)
+    
+    def _save_java_file(self, base_dir: Path, match, rank: Optional[int]):
+        """Save one _FILE_RE match under the directory of its package"""
+        filename = match.group(1).strip()
+        code = match.group(2)
+        
+        # Remove markdown code blocks if present
+        if '```' in code:
+            code = self._extract_code(code)
+        
+        # Determine package from content
+        package_match = _PACKAGE_RE.search(code)
+        if not package_match:
+            print(f"⚠ Skipping {filename} - no package declaration found")
+            return
+        
+        package_path = package_match.group(1).replace('.', '/')
+        
+        if self._write_generated(base_dir / package_path / filename, code, rank):
+            print(f"  ✓ Generated {filename}")
+    
+    def _write_generated(self, file_path: Path, content: str, rank: Optional[int] = None) -> bool:
+        """
+        Write a generated file unless a later-ranked step already wrote it.
+        Steps run concurrently, so ranks keep "later step wins" deterministic;
+        rank None always writes.
+        """
+        with self._write_lock:
+            if rank is not None:
+                if self._file_ranks.get(file_path, rank) > rank:
+                    return False
+                self._file_ranks[file_path] = rank
             
-            with open(file_path, 'w') as f:
-                f.write(code)
+            if file_path.parent not in self._known_dirs:
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                self._known_dirs.add(file_path.parent)
             
-            print(f"  ✓ Generated {filename}")
+            file_path.write_text(content, encoding='utf-8')
+        return True
 
 
 # Example usage and sample OAS files
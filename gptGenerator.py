@@ -36,42 +36,125 @@ endpoints:
 """
 #!/usr/bin/env python3
 
+import asyncio
+import hashlib
+import os
+import random
+import shutil
+import sqlite3
 import subprocess
+import time
 import yaml
 import json
 import re
 import pathlib
-import textwrap
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import httpx
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used when missing
+    orjson = None
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 # ================= CONFIG =================
 
 GENERATOR_VERSION = "7.6.0"
 GENERATOR_JAR = f"openapi-generator-cli-{GENERATOR_VERSION}.jar"
 GENERATOR_URL = f"https://repo1.maven.org/maven2/org/openapitools/openapi-generator-cli/{GENERATOR_VERSION}/{GENERATOR_JAR}"
+# SHA-1 Maven Central publishes for GENERATOR_JAR (the ".jar.sha1" file);
+# update it together with GENERATOR_VERSION. It is pinned here rather than
+# fetched next to the JAR, so a tampered download cannot ship its own checksum.
+GENERATOR_SHA1 = ""
 
 EXTERNAL_OAS = "external.yaml"
 INTERNAL_OAS = "internal.yaml"
 MAPPING_FILE = "mapping.yaml"
 APP_DIR = "app"
 
-LITELLM_URL = "http://localhost:4000/v1/chat/completions"
+# Point LITELLM_BASE_URL straight at a LiteLLM instance (not a shared load
+# balancer) when one is reachable; every request reuses its connections
+LITELLM_BASE_URL = os.environ.get("LITELLM_BASE_URL", "http://localhost:4000")
+LITELLM_PATH = "/v1/chat/completions"
 MODEL = "bedrock/nova-lite"
+# Method bodies requested from the LLM at the same time
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "8"))
+# Responses by prompt hash, so unchanged endpoints skip the LLM on re-runs
+LLM_CACHE_DB = ".llm_cache.sqlite"
+# Endpoints whose bodies are requested together in one LLM call
+BATCH_SIZE = 10
+# Requests per second allowed to LiteLLM (0 = no client-side limit)
+LITELLM_RPS = float(os.environ.get("LITELLM_RPS", "0"))
+# Attempts per LLM request on 429/5xx and connection errors
+LLM_MAX_ATTEMPTS = 5
 
 # ================= UTILS =================
 
 def run(cmd):
     print(f"\n▶ {cmd}")
-    subprocess.run(cmd, shell=True, check=True)
+    # Output is captured so commands running side by side do not interleave;
+    # it is shown only when the command fails
+    res = subprocess.run(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if res.returncode != 0:
+        print(res.stdout)
+        raise subprocess.CalledProcessError(res.returncode, cmd, output=res.stdout)
+
+def json_loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def json_bytes(obj):
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode()
 
 def load_yaml(path):
-    with open(path) as f:
-        return yaml.safe_load(f)
+    st = os.stat(path)
+    return _load_yaml(path, st.st_mtime_ns, st.st_size)
+
+@lru_cache(maxsize=8)
+def _load_yaml(path, mtime_ns, size):
+    """Parsed YAML, memoized on (path, mtime, size) so an edited file is re-read"""
+    # libyaml-backed loader when PyYAML was built with it
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+def sha1_of(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 def ensure_generator():
-    if not pathlib.Path(GENERATOR_JAR).exists():
-        print("⬇ Downloading OpenAPI Generator JAR...")
-        urllib.request.urlretrieve(GENERATOR_URL, GENERATOR_JAR)
+    """Download the pinned generator JAR once; later runs reuse it offline.
+    Both the download and the reused file are checked against GENERATOR_SHA1,
+    so a truncated or replaced JAR is detected and fetched again. Until the
+    pin is filled in, the JAR is used unverified."""
+    if not GENERATOR_SHA1:
+        print(f"⚠ GENERATOR_SHA1 is not set; {GENERATOR_JAR} is not verified")
+        if not pathlib.Path(GENERATOR_JAR).exists():
+            print("⬇ Downloading OpenAPI Generator JAR...")
+            urllib.request.urlretrieve(GENERATOR_URL, GENERATOR_JAR)
+        return
+
+    jar = pathlib.Path(GENERATOR_JAR)
+    if jar.exists() and sha1_of(jar) == GENERATOR_SHA1:
+        return
+
+    print("⬇ Downloading OpenAPI Generator JAR...")
+    partial = jar.with_suffix(".part")
+    urllib.request.urlretrieve(GENERATOR_URL, partial)
+    if sha1_of(partial) != GENERATOR_SHA1:
+        partial.unlink()
+        raise RuntimeError(f"{GENERATOR_JAR} does not match its pinned SHA-1")
+
+    partial.replace(jar)
 
 # ================= STEP 1: SPRING APP =================
 
@@ -95,7 +178,20 @@ java -jar {GENERATOR_JAR} generate \
   --additional-properties=library=webclient,useJakartaEe=true
 """)
 
-    run(f"cp -r /tmp/internal/src/main/java/* {APP_DIR}/src/main/java/")
+def copy_internal_client():
+    """Copy the client sources into the app: directories first, then the
+    files in parallel (copyfile uses the kernel's copy_file_range/sendfile)"""
+    src_root = pathlib.Path("/tmp/internal/src/main/java")
+    dst_root = pathlib.Path(APP_DIR, "src", "main", "java")
+
+    files = []
+    for root, _, names in os.walk(src_root):
+        rel = pathlib.Path(root).relative_to(src_root)
+        (dst_root / rel).mkdir(parents=True, exist_ok=True)
+        files.extend(rel / name for name in names)
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        list(ex.map(lambda rel: shutil.copyfile(src_root / rel, dst_root / rel), files))
 
 # ================= STEP 3: CONFIG =================
 
@@ -120,85 +216,355 @@ public class WebClientConfig {
 }
 """)
 
+SKIP_DIRS = {"target", "node_modules", ".git"}
+
+@lru_cache(maxsize=None)
+def find_delegate_impl():
+    """The generated *DelegateImpl.java, looked up once under src/main/java
+    rather than across the whole app tree (build output included)"""
+    for root, dirs, files in os.walk(os.path.join(APP_DIR, "src", "main", "java")):
+        # Never descend into build output or VCS metadata
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in files:
+            if name.endswith("DelegateImpl.java"):
+                return pathlib.Path(root, name)
+    raise FileNotFoundError(f"No *DelegateImpl.java under {APP_DIR}/src/main/java")
+
 # ================= STEP 4: LLM =================
 
-def llm(prompt):
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, bursts up to
+    `capacity`; used from a single event loop"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+rate_limiter = TokenBucket(LITELLM_RPS, max(1.0, LITELLM_RPS)) if LITELLM_RPS > 0 else None
+
+def is_retryable(exc):
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+def retry_delay(exc, attempt):
+    """Retry-After when the server sent one, else jittered exponential backoff"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        retry_after = exc.response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    return min(30.0, 2 ** attempt) * random.uniform(0.5, 1.0)
+
+async def llm(client, prompt):
+    for attempt in range(LLM_MAX_ATTEMPTS):
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        try:
+            return await request_completion(client, prompt)
+        except (httpx.HTTPStatusError, httpx.TransportError) as exc:
+            if not is_retryable(exc) or attempt == LLM_MAX_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(retry_delay(exc, attempt))
+
+async def request_completion(client, prompt):
     payload = {
         "model": MODEL,
-        "messages": [{"role": "user", "content": prompt}],
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
         "temperature": 0
     }
 
-    res = subprocess.run(
-        ["curl", "-s", "-X", "POST", LITELLM_URL,
-         "-H", "Content-Type: application/json",
-         "-d", json.dumps(payload)],
-        capture_output=True,
-        text=True
+    res = await client.post(
+        LITELLM_PATH,
+        content=json_bytes(payload),
+        headers={"Content-Type": "application/json"}
     )
+    res.raise_for_status()
 
-    return json.loads(res.stdout)["choices"][0]["message"]["content"]
+    return json_loads(res.content)["choices"][0]["message"]["content"]
 
-# ================= STEP 5: MERGE =================
+# Everything that is the same for every endpoint, sent first so the backend
+# can reuse its prompt cache; only the endpoint details follow it
+SYSTEM_PROMPT = """Generate Java method bodies ONLY, for Spring delegate methods
+that call an internal client.
 
-def merge_method(java_file, method, body):
-    src = java_file.read_text()
+Rules:
+- Must return ResponseEntity
+- Catch WebClientResponseException.NotFound
+- No imports, annotations, class definitions
+"""
 
-    pattern = re.compile(
-        rf"(public .* {method}\(.*?\)\s*\{{)(.*?)(\n\s*\}})",
-        re.S
-    )
+def prepare_mapping(mapping):
+    """Render each endpoint's parameter list once, as the external signature
+    ("String id, int page") and the matching call arguments ("id, page")"""
+    for cfg in mapping.values():
+        params = cfg['external'].get('params') or []
+        cfg['_sig'] = ", ".join([f"{p['type']} {p['name']}" for p in params])
+        cfg['_args'] = ", ".join([p['name'] for p in params])
 
-    m = pattern.search(src)
-    if not m:
-        raise RuntimeError(f"{method} not found")
-
-    new_src = (
-        src[:m.start()]
-        + m.group(1)
-        + "\n"
-        + textwrap.indent(body.strip(), " " * 8)
-        + m.group(3)
-        + src[m.end():]
-    )
+def build_prompt(method, cfg):
+    return f"""External:
+ResponseEntity<{cfg['external']['response']}> {method}({cfg['_sig']})
 
-    java_file.write_text(new_src)
+Internal:
+{cfg['internal']['client']}.{cfg['internal']['method']}({cfg['_args']})
+"""
+
+def build_batch_prompt(items):
+    methods = [
+        {
+            "name": method,
+            "external": f"ResponseEntity<{cfg['external']['response']}> {method}({cfg['_sig']})",
+            "internal": f"{cfg['internal']['client']}.{cfg['internal']['method']}({cfg['_args']})"
+        }
+        for method, cfg, _ in items
+    ]
+    return f"""Respond with ONLY a JSON object mapping method name to method body string, no prose.
+
+Methods:
+{json.dumps(methods, indent=2)}
+"""
+
+def parse_bodies(reply):
+    """JSON object of a batch reply, tolerating a fence or prose around it"""
+    start, end = reply.find("{"), reply.rfind("}")
+    if start == -1 or end < start:
+        return {}
+    try:
+        parsed = json_loads(reply[start:end + 1])
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+def open_cache():
+    conn = sqlite3.connect(LLM_CACHE_DB)
+    conn.execute("CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, body TEXT, ts REAL)")
+    return conn
+
+def cache_key(prompt):
+    # Indentation and blank edges do not change the request
+    normalized = "\n".join(line.strip() for line in prompt.strip().splitlines())
+    return hashlib.sha256(f"{MODEL}\n{SYSTEM_PROMPT}\n{normalized}".encode()).hexdigest()
+
+async def generate_batch(client, sem, items):
+    """Bodies for (method, cfg, key) items from one request; any the reply
+    misses are asked for one by one"""
+    async with sem:
+        bodies = parse_bodies(await llm(client, build_batch_prompt(items)))
+
+    async def single(method, cfg):
+        async with sem:
+            return await llm(client, build_prompt(method, cfg))
+
+    missing = [(m, cfg) for m, cfg, _ in items if not isinstance(bodies.get(m), str)]
+    retried = await asyncio.gather(*(single(m, cfg) for m, cfg in missing))
+    bodies.update(zip((m for m, _ in missing), retried))
+
+    return {m: bodies[m] for m, _, _ in items}
+
+async def generate_bodies(mapping):
+    """Ask for every uncached method body, BATCH_SIZE endpoints per request,
+    with the batches in flight concurrently over one pooled client"""
+    sem = asyncio.Semaphore(LLM_CONCURRENCY)
+    limits = httpx.Limits(max_connections=64, max_keepalive_connections=64)
+    cache = open_cache()
+
+    try:
+        bodies, pending = {}, []
+        for method, cfg in mapping.items():
+            key = cache_key(build_prompt(method, cfg))
+            row = cache.execute("SELECT body FROM cache WHERE key=?", (key,)).fetchone()
+            if row:
+                bodies[method] = row[0]
+            else:
+                pending.append((method, cfg, key))
+
+        async def checkpointed(batch):
+            # Stored as soon as the batch completes, so a run that fails later
+            # resumes from every batch that already finished
+            result = await generate_batch(client, sem, batch)
+            now = time.time()
+            with cache:
+                cache.executemany(
+                    "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                    [(key, result[method], now) for method, _, key in batch]
+                )
+            bodies.update(result)
+
+        batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+        # HTTP/2 multiplexes the concurrent requests over one connection
+        # (https endpoints, with the h2 package installed)
+        async with httpx.AsyncClient(
+            base_url=LITELLM_BASE_URL, http2=HTTP2_AVAILABLE, limits=limits, timeout=60
+        ) as client:
+            # A failed batch does not cancel the others; the first error is
+            # raised once every batch has finished or failed
+            results = await asyncio.gather(*(checkpointed(b) for b in batches), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+    finally:
+        cache.close()
+
+    return {method: bodies[method] for method in mapping}
+
+# ================= STEP 5: MERGE =================
+
+# "public <type> name(" of a method declaration; the parameter list and
+# body are then walked by hand, which stays linear in the file size
+METHOD_RE = re.compile(r"\bpublic\s+[^;{}()=]*?\b(?P<name>\w+)\s*\(")
+
+# Start of every non-blank line (what textwrap.indent indents), in one C pass
+BODY_LINE_RE = re.compile(r"^(?=[^\n]*\S)", re.M)
+
+def skip_literal(src, i):
+    """Index just past the string/char literal or comment starting at i, or
+    i itself when there is none"""
+    c = src[i]
+    if c in "\"'":
+        i += 1
+        while i < len(src) and src[i] != c:
+            i += 2 if src[i] == "\\" else 1
+        return i + 1
+    if src.startswith("//", i):
+        end = src.find("\n", i)
+        return len(src) if end == -1 else end
+    if src.startswith("/*", i):
+        end = src.find("*/", i + 2)
+        return len(src) if end == -1 else end + 2
+    return i
+
+def find_closing(src, i, opening, closing):
+    """Index of the bracket closing the one at src[i]"""
+    depth = 0
+    while i < len(src):
+        j = skip_literal(src, i)
+        if j != i:
+            i = j
+            continue
+        if src[i] == opening:
+            depth += 1
+        elif src[i] == closing:
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+def method_bodies(src):
+    """{name: (index of the body's "{", index of its "}")} for the public
+    methods of src, from one left-to-right pass"""
+    spans = {}
+    pos = 0
+    for m in METHOD_RE.finditer(src):
+        # Declarations inside an already scanned body (anonymous classes)
+        if m.start() < pos:
+            continue
+        params_end = find_closing(src, m.end() - 1, "(", ")")
+        if params_end == -1:
+            continue
+        # Skip declarations without a body (interfaces, abstract methods)
+        brace = src.find("{", params_end)
+        if brace == -1 or ";" in src[params_end:brace]:
+            continue
+        close = find_closing(src, brace, "{", "}")
+        if close == -1:
+            continue
+        spans.setdefault(m.group("name"), (brace, close))
+        pos = close + 1
+    return spans
+
+def merge_methods(src, bodies):
+    """Replace the body of every method in bodies ({name: java}) and return
+    the new source"""
+    spans = method_bodies(src)
+    for method in bodies:
+        if method not in spans:
+            raise RuntimeError(f"{method} not found")
+
+    pieces = []
+    pos = 0
+    for method, (brace, close) in sorted(((m, spans[m]) for m in bodies), key=lambda item: item[1]):
+        # Keep the closing brace on its own line at its current indentation
+        line_start = src.rfind("\n", brace, close)
+        if line_start != -1 and not src[line_start:close].strip():
+            tail = src[line_start:close + 1]
+        else:
+            brace_line = src[src.rfind("\n", 0, brace) + 1:brace]
+            tail = "\n" + brace_line[:len(brace_line) - len(brace_line.lstrip())] + "}"
+
+        pieces += [
+            src[pos:brace + 1],
+            "\n",
+            BODY_LINE_RE.sub(" " * 8, bodies[method].strip()),
+            tail
+        ]
+        pos = close + 1
+
+    pieces.append(src[pos:])
+    return "".join(pieces)
+
+# ================= STEP 6: BUILD =================
+
+def build_app():
+    """Package the app in parallel (-T 1C). Once a build has resolved the
+    dependencies (marked by .deps-warmed) it runs offline, going back online
+    only if the offline build fails."""
+    warmed = pathlib.Path(APP_DIR, ".deps-warmed")
+    package = f"cd {APP_DIR} && mvn -T 1C -q -DskipTests package"
+
+    if warmed.exists():
+        try:
+            run(f"{package} -o")
+            return
+        except subprocess.CalledProcessError:
+            print("⚠ Offline build failed, retrying online")
+
+    run(package)
+    warmed.touch()
 
 # ================= MAIN =================
 
 def main():
     ensure_generator()
 
-    generate_spring()
-    generate_internal_client()
+    # Two independent JVM runs writing to different directories
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        futures = [ex.submit(generate_spring), ex.submit(generate_internal_client)]
+        for f in futures:
+            f.result()
+    copy_internal_client()
     add_webclient_config()
 
     mapping = load_yaml(MAPPING_FILE)["endpoints"]
+    prepare_mapping(mapping)
 
-    delegate = next(pathlib.Path(APP_DIR).rglob("*DelegateImpl.java"))
+    delegate = find_delegate_impl()
 
-    for method, cfg in mapping.items():
-        prompt = f"""
-Generate Java method body ONLY.
+    bodies = asyncio.run(generate_bodies(mapping))
 
-External:
-ResponseEntity<{cfg['external']['response']}> {method}(String id)
-
-Internal:
-{cfg['internal']['client']}.{cfg['internal']['method']}(id)
-
-Rules:
-- Must return ResponseEntity
-- Catch WebClientResponseException.NotFound
-- No imports, annotations, class definitions
-"""
+    # All bodies are merged in memory and the file is written once
+    delegate.write_text(merge_methods(delegate.read_text(), bodies))
 
-        body = llm(prompt)
-        merge_method(delegate, method, body)
+    build_app()
 
     print("\n✅ DONE")
     print("Run:")
-    print(f"cd {APP_DIR} && mvn clean spring-boot:run")
+    print(f"cd {APP_DIR} && mvn -o spring-boot:run")
 
 if __name__ == "__main__":
     main()
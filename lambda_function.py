@@ -1,5 +1,11 @@
 import boto3
 import json
+import re
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used when missing
+    orjson = None
 
 # Initialize Bedrock Agent Runtime client
 client = boto3.client("bedrock-agent-runtime", region_name="us-east-1")
@@ -16,24 +22,54 @@ def invoke_agent(wsdl_content: str):
     )
     
     # Collect streaming output
-    output_text = ""
+    parts = []
     for event in response["completion"]:
         if "chunk" in event:
-            output_text += event["chunk"]["bytes"].decode("utf-8")
+            parts.append(event["chunk"]["bytes"].decode("utf-8"))
+    
+    return "".join(parts)
+
+# Characters that matter for brace depth: braces, quotes and escapes
+# (a backslash at the very end escapes the first character of the next text)
+_JSON_TOKEN_RE = re.compile(r'\\.?|[{}"]', re.S)
+
+def scan_braces(text: str, state=(0, False, False)):
+    """
+    Advance (open brace depth, inside a string, pending escape) over text.
+    Braces inside JSON strings are not counted.
+    """
+    depth, in_string, escape = state
+    start = 0
+    if escape and text:
+        start, escape = 1, False
+    
+    for m in _JSON_TOKEN_RE.finditer(text, start):
+        token = m.group()
+        if token[0] == "\\":
+            escape = len(token) == 1
+        elif token == '"':
+            in_string = not in_string
+        elif not in_string:
+            depth += 1 if token == "{" else -1
     
-    return output_text
+    return depth, in_string, escape
 
 def get_complete_oas(wsdl_content: str):
-    raw_output = invoke_agent(wsdl_content)
+    parts = [invoke_agent(wsdl_content)]
+    state = scan_braces(parts[0])
     
-    # Ensure JSON is complete
-    while raw_output.count("{") > raw_output.count("}"):
+    # Ensure JSON is complete; only each new continuation is scanned
+    while state[0] > 0:
         continuation = invoke_agent("continue JSON")
-        raw_output += continuation
+        parts.append(continuation)
+        state = scan_braces(continuation, state)
+    
+    raw_output = "".join(parts)
     
     # Validate JSON
     try:
-        spec = json.loads(raw_output)
+        # orjson's decode error subclasses json.JSONDecodeError
+        spec = orjson.loads(raw_output) if orjson is not None else json.loads(raw_output)
     except json.JSONDecodeError as e:
         print("❌ JSON parse failed:", e)
         print("Partial output:\n", raw_output[:500])
@@ -47,8 +83,12 @@ if __name__ == "__main__":
     
     oas = get_complete_oas(wsdl_content)
     
-    with open("oas3.json", "w") as f:
-        json.dump(oas, f, indent=2)
+    if orjson is not None:
+        with open("oas3.json", "wb") as f:
+            f.write(orjson.dumps(oas, option=orjson.OPT_INDENT_2))
+    else:
+        with open("oas3.json", "w") as f:
+            json.dump(oas, f, indent=2)
     
     print("✅ OpenAPI 3.0 spec generated: oas3.json")
 